@@ -12,6 +12,7 @@ from utils.version import get_version  # Import version management
 from utils.latency_monitor import init_latency_monitoring  # Import latency monitoring
 from utils.traffic_logger import init_traffic_logging  # Import traffic logging
 from utils.logging import get_logger, log_startup_banner  # Import centralized logging
+from utils.json_provider import OrjsonProvider  # Import orjson-backed JSON provider
 # Import WebSocket proxy server - using relative import to avoid @ symbol issues
 from websocket_proxy.app_integration import start_websocket_proxy
 
@@ -58,6 +59,9 @@ def create_app():
     # Initialize Flask application
     app = Flask(__name__)
 
+    # Serialize jsonify responses with orjson
+    app.json = OrjsonProvider(app)
+
     # Initialize SocketIO
     socketio.init_app(app)  # Link SocketIO to the Flask app
 
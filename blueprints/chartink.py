@@ -178,11 +178,7 @@ def schedule_squareoff(strategy_id):
         hours, minutes = map(int, strategy.squareoff_time.split(':'))
         job_id = f'squareoff_{strategy_id}'
         
-        # Remove existing job if any
-        if scheduler.get_job(job_id):
-            scheduler.remove_job(job_id)
-        
-        # Add new job
+        # Add or replace the job
         scheduler.add_job(
             squareoff_positions,
             'cron',
@@ -190,6 +186,7 @@ def schedule_squareoff(strategy_id):
             minute=minutes,
             args=[strategy_id],
             id=job_id,
+            replace_existing=True,
             timezone=pytz.timezone('Asia/Kolkata')
         )
         logger.info(f'Scheduled squareoff for strategy {strategy_id} at {hours}:{minutes}')
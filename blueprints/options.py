@@ -1,11 +1,254 @@
-from flask import Blueprint, jsonify, request, render_template, session, redirect, url_for, Response
+from flask import Blueprint, jsonify, request, render_template, session, redirect, url_for, Response, g
 from database.auth_db import get_auth_token
 from utils.session import check_session_validity
 from utils.logging import get_logger
+from utils.greeks_kernel import greeks
+from utils.options_chain import ChainSoA
+from functools import lru_cache
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, fields
+import threading
+import queue
+import time
+import hashlib
 import json
+import orjson
+import numpy as np
+from cachetools import TTLCache, cached
 
 logger = get_logger(__name__)
 
+def _auth_token(user):
+    """Return the user's auth token, fetched at most once per request"""
+    tok = getattr(g, '_auth_tok', None)
+    if tok is None:
+        tok = get_auth_token(user)
+        g._auth_tok = tok
+    return tok
+
+# Static option strategy catalogue, serialized once at import time
+_STRATEGIES_PAYLOAD = {
+    'status': 'success',
+    'strategies': [
+        {
+            'id': 'long-straddle',
+            'name': 'Long Straddle',
+            'description': 'Buy call and put at the same strike price',
+            'category': 'volatility',
+            'legs': [
+                {'action': 'BUY', 'type': 'CALL', 'strike_offset': 0},
+                {'action': 'BUY', 'type': 'PUT', 'strike_offset': 0}
+            ]
+        },
+        {
+            'id': 'long-strangle',
+            'name': 'Long Strangle',
+            'description': 'Buy call and put at different strike prices',
+            'category': 'volatility',
+            'legs': [
+                {'action': 'BUY', 'type': 'CALL', 'strike_offset': 50},
+                {'action': 'BUY', 'type': 'PUT', 'strike_offset': -50}
+            ]
+        },
+        {
+            'id': 'iron-condor',
+            'name': 'Iron Condor',
+            'description': 'Sell call and put spreads for range-bound markets',
+            'category': 'income',
+            'legs': [
+                {'action': 'BUY', 'type': 'PUT', 'strike_offset': -100},
+                {'action': 'SELL', 'type': 'PUT', 'strike_offset': -50},
+                {'action': 'SELL', 'type': 'CALL', 'strike_offset': 50},
+                {'action': 'BUY', 'type': 'CALL', 'strike_offset': 100}
+            ]
+        },
+        {
+            'id': 'bull-call-spread',
+            'name': 'Bull Call Spread',
+            'description': 'Buy lower strike call, sell higher strike call',
+            'category': 'directional',
+            'legs': [
+                {'action': 'BUY', 'type': 'CALL', 'strike_offset': 0},
+                {'action': 'SELL', 'type': 'CALL', 'strike_offset': 50}
+            ]
+        }
+    ]
+}
+
+_STRATEGIES_JSON = json.dumps(_STRATEGIES_PAYLOAD).encode()
+
+# Mock option chain in columnar form - replaced by the live broker feed in production
+_MOCK_CHAIN = ChainSoA(
+    strikes=np.array([21700, 21750, 21800], dtype=np.int64),
+    call_oi=np.array([15420, 18750, 22890], dtype=np.int64),
+    call_volume=np.array([2450, 3200, 4850], dtype=np.int64),
+    call_iv=np.array([22.15, 20.85, 19.75]),
+    call_ltp=np.array([145.30, 165.80, 188.45]),
+    call_bid=np.array([144.50, 165.00, 187.60]),
+    call_ask=np.array([146.10, 166.60, 189.30]),
+    call_change=np.array([8.25, 12.40, 15.80]),
+    put_oi=np.array([45680, 52100, 68450], dtype=np.int64),
+    put_volume=np.array([8920, 12340, 15670], dtype=np.int64),
+    put_iv=np.array([28.40, 26.20, 24.80]),
+    put_ltp=np.array([22.55, 28.65, 36.45]),
+    put_bid=np.array([22.30, 28.40, 36.20]),
+    put_ask=np.array([22.80, 28.90, 36.70]),
+    put_change=np.array([-3.45, -2.15, -1.25])
+)
+
+# Chain aggregates shown in the market overview, derived from the mock chain
+_MOCK_PCR = round(_MOCK_CHAIN.pcr(), 2)
+_MOCK_MAX_PAIN = _MOCK_CHAIN.max_pain()
+
+# Serialized mock payloads are cached per query. Live-refreshing endpoints
+# share one upstream fetch per key for 250 ms
+_chain_cache = TTLCache(maxsize=512, ttl=0.25)
+_market_cache = TTLCache(maxsize=512, ttl=0.25)
+
+@cached(_chain_cache, lock=threading.Lock())
+def _chain_payload(symbol, expiry, strike_range):
+    """Serialized options chain for a symbol, expiry and strike range"""
+    # For now, return mock data - this would be replaced with actual broker API calls
+    mock_chain_data = {
+        'status': 'success',
+        'symbol': symbol,
+        'expiry': expiry,
+        'underlying_price': 21832.15,
+        'options': _MOCK_CHAIN.to_options()
+    }
+    return orjson.dumps(mock_chain_data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def _symbol_seed(symbol):
+    """Stable non-negative 63-bit Greeks seed for a symbol, identical across worker processes"""
+    digest = hashlib.blake2b(symbol.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') >> 1
+
+@lru_cache(maxsize=256)
+def _greeks_payload(symbol):
+    """Serialized option Greeks for a symbol"""
+    # Mock Greeks data - in production, this would be calculated or fetched from broker
+    delta, gamma, theta, vega, rho = greeks(_symbol_seed(symbol))
+    mock_greeks = {
+        'status': 'success',
+        'symbol': symbol,
+        'greeks': {
+            'delta': round(delta, 3),
+            'gamma': round(gamma, 3),
+            'theta': round(theta, 3),
+            'vega': round(vega, 3),
+            'rho': round(rho, 4)
+        },
+        'last_updated': '2024-01-15T10:30:00+05:30'
+    }
+    return orjson.dumps(mock_greeks)
+
+@cached(_market_cache, lock=threading.Lock())
+def _market_payload(symbol):
+    """Serialized market overview for a symbol"""
+    # Mock market data - in production, this would be fetched from real market feeds
+    mock_market_data = {
+        'status': 'success',
+        'symbol': symbol,
+        'data': {
+            'underlying_price': 21832.15,
+            'change': 124.30,
+            'change_percent': 0.57,
+            'pcr_value': _MOCK_PCR,
+            'max_pain': _MOCK_MAX_PAIN,
+            'implied_volatility': 18.45,
+            'support_levels': [21750, 21700, 21650],
+            'resistance_levels': [21900, 21950, 22000]
+        },
+        'last_updated': '2024-01-15T10:30:00+05:30'
+    }
+    return orjson.dumps(mock_market_data)
+
+# Options orders are collected for up to _BATCH_WINDOW seconds (or _BATCH_SIZE
+# orders) and submitted to the broker together
+_ORDER_QUEUE = queue.Queue()
+_BATCH_SIZE = 50
+_BATCH_WINDOW = 0.005
+_order_worker = None
+_order_worker_lock = threading.Lock()
+
+@dataclass(slots=True, frozen=True)
+class OrderReq:
+    """Options order request as posted by the terminal"""
+    symbol: str
+    type: str
+    quantity: int
+    priceType: str
+    price: float | None = None
+
+    def __post_init__(self):
+        if not (self.symbol and self.type and self.quantity and self.priceType):
+            raise ValueError('Missing required parameters')
+
+_ORDER_FIELDS = tuple(f.name for f in fields(OrderReq))
+
+def _order_digest(symbol, quantity):
+    """Stable 64-bit digest of an order, identical across worker processes"""
+    digest = hashlib.blake2b(f"{symbol}|{quantity}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def _place_bulk_orders(orders):
+    """Place a batch of options orders, returning one response per order"""
+    # For now, return mock success responses
+    # In production, this would integrate with the actual broker bulk order API
+    return [{
+        'status': 'success',
+        'message': f'Options order placed successfully for {order.symbol}',
+        'orderid': f'OPT{_order_digest(order.symbol, order.quantity) % 10000:04d}',
+        'details': {
+            'symbol': order.symbol,
+            'type': order.type,
+            'quantity': order.quantity,
+            'price_type': order.priceType,
+            'price': order.price if order.priceType == 'LIMIT' else 'MARKET'
+        }
+    } for order in orders]
+
+def _process_order_batches():
+    """Drain the order queue in batches bounded by size and time window"""
+    while True:
+        batch = [_ORDER_QUEUE.get()]
+        deadline = time.monotonic() + _BATCH_WINDOW
+        while len(batch) < _BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_ORDER_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Drop orders whose request timed out and withdrew them
+        batch = [(order, future) for order, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            continue
+
+        try:
+            results = _place_bulk_orders([order for order, _ in batch])
+        except Exception as e:
+            logger.error("Error placing options order batch: %s", e)
+            for _, future in batch:
+                future.set_exception(e)
+            continue
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+def _submit_order(order):
+    """Queue an order for the next batch and return a Future for its response"""
+    global _order_worker
+    with _order_worker_lock:
+        if _order_worker is None:
+            _order_worker = threading.Thread(target=_process_order_batches, daemon=True)
+            _order_worker.start()
+    future = Future()
+    _ORDER_QUEUE.put((order, future))
+    return future
+
 # Define the blueprint
 options_bp = Blueprint('options_bp', __name__, url_prefix='/')
 
@@ -14,32 +257,34 @@ options_bp = Blueprint('options_bp', __name__, url_prefix='/')
 def options_terminal():
     """Render the Options Trading Terminal page"""
     try:
+        # Read session values once up front
+        sess = session._get_current_object()
+        user_role = sess.get('user_role')
+        login_username = sess.get('user')
+        broker = sess.get('broker')
+        
         # Check if user has proper role access (Administrator or Pro Trader)
-        user_role = session.get('user_role')
         if user_role and user_role not in ['Administrator', 'Pro Trader']:
-            logger.warning(f"User {session.get('user')} with role {user_role} attempted to access Options Terminal")
+            logger.warning("User %s with role %s attempted to access Options Terminal", login_username, user_role)
             return redirect(url_for('dashboard_bp.dashboard'))
         
-        # Get broker information from session
-        broker = session.get('broker')
-        login_username = session.get('user')
         
         if not broker:
             logger.error("Broker not set in session")
             return redirect(url_for('dashboard_bp.dashboard'))
         
         # Get auth token for potential API calls
-        auth_token = get_auth_token(login_username)
+        auth_token = _auth_token(login_username)
         
         if auth_token is None:
-            logger.warning(f"No auth token found for user {login_username}")
+            logger.warning("No auth token found for user %s", login_username)
             return redirect(url_for('auth.logout'))
         
         # Initialize default data for the options terminal
         market_data = {
             'underlying_price': 21832.15,
-            'pcr_value': 0.87,
-            'max_pain': 21800,
+            'pcr_value': _MOCK_PCR,
+            'max_pain': _MOCK_MAX_PAIN,
             'implied_volatility': 18.45
         }
         
@@ -51,11 +296,11 @@ def options_terminal():
             'user_role': user_role
         }
         
-        logger.info(f"Options Terminal accessed by user {login_username} with broker {broker}")
+        logger.info("Options Terminal accessed by user %s with broker %s", login_username, broker)
         return render_template('options_terminal.html', **template_data)
         
     except Exception as e:
-        logger.error(f"Error in options_terminal route: {str(e)}")
+        logger.error("Error in options_terminal route: %s", e)
         return redirect(url_for('dashboard_bp.dashboard'))
 
 @options_bp.route('/api/options/chain-data', methods=['GET'])
@@ -67,83 +312,10 @@ def get_options_chain():
         expiry = request.args.get('expiry')
         strike_range = request.args.get('range', '20')
         
-        # For now, return mock data - this would be replaced with actual broker API calls
-        mock_chain_data = {
-            'status': 'success',
-            'symbol': symbol,
-            'expiry': expiry,
-            'underlying_price': 21832.15,
-            'options': [
-                {
-                    'strike': 21700,
-                    'call': {
-                        'oi': 15420,
-                        'volume': 2450,
-                        'iv': 22.15,
-                        'ltp': 145.30,
-                        'bid': 144.50,
-                        'ask': 146.10,
-                        'change': 8.25
-                    },
-                    'put': {
-                        'oi': 45680,
-                        'volume': 8920,
-                        'iv': 28.40,
-                        'ltp': 22.55,
-                        'bid': 22.30,
-                        'ask': 22.80,
-                        'change': -3.45
-                    }
-                },
-                {
-                    'strike': 21750,
-                    'call': {
-                        'oi': 18750,
-                        'volume': 3200,
-                        'iv': 20.85,
-                        'ltp': 165.80,
-                        'bid': 165.00,
-                        'ask': 166.60,
-                        'change': 12.40
-                    },
-                    'put': {
-                        'oi': 52100,
-                        'volume': 12340,
-                        'iv': 26.20,
-                        'ltp': 28.65,
-                        'bid': 28.40,
-                        'ask': 28.90,
-                        'change': -2.15
-                    }
-                },
-                {
-                    'strike': 21800,
-                    'call': {
-                        'oi': 22890,
-                        'volume': 4850,
-                        'iv': 19.75,
-                        'ltp': 188.45,
-                        'bid': 187.60,
-                        'ask': 189.30,
-                        'change': 15.80
-                    },
-                    'put': {
-                        'oi': 68450,
-                        'volume': 15670,
-                        'iv': 24.80,
-                        'ltp': 36.45,
-                        'bid': 36.20,
-                        'ask': 36.70,
-                        'change': -1.25
-                    }
-                }
-            ]
-        }
-        
-        return jsonify(mock_chain_data)
+        return Response(_chain_payload(symbol, expiry, strike_range), mimetype='application/json')
         
     except Exception as e:
-        logger.error(f"Error in get_options_chain: {str(e)}")
+        logger.error("Error in get_options_chain: %s", e)
         return jsonify({
             'status': 'error',
             'message': f'Error fetching options chain: {str(e)}'
@@ -154,24 +326,21 @@ def get_options_chain():
 def place_options_order():
     """API endpoint to place options orders"""
     try:
-        # Get data from request
-        data = request.json
-        symbol = data.get('symbol')
-        order_type = data.get('type')
-        quantity = data.get('quantity')
-        price_type = data.get('priceType')
-        price = data.get('price')
-        
-        if not all([symbol, order_type, quantity, price_type]):
+        # Parse the request body once into a validated order
+        data = request.get_json(silent=True) or {}
+        try:
+            req = OrderReq(**{k: data[k] for k in _ORDER_FIELDS if k in data})
+        except (TypeError, ValueError):
             return jsonify({
                 'status': 'error',
                 'message': 'Missing required parameters'
             }), 400
         
         # Get auth token from session
-        login_username = session['user']
-        auth_token = get_auth_token(login_username)
-        broker_name = session.get('broker')
+        sess = session._get_current_object()
+        login_username = sess['user']
+        broker_name = sess.get('broker')
+        auth_token = _auth_token(login_username)
         
         if not auth_token or not broker_name:
             return jsonify({
@@ -179,26 +348,29 @@ def place_options_order():
                 'message': 'Authentication error'
             }), 401
         
-        # For now, return a mock success response
-        # In production, this would integrate with the actual broker API
-        mock_response = {
-            'status': 'success',
-            'message': f'Options order placed successfully for {symbol}',
-            'orderid': f'OPT{abs(hash(symbol + str(quantity)))%10000:04d}',
-            'details': {
-                'symbol': symbol,
-                'type': order_type,
-                'quantity': quantity,
-                'price_type': price_type,
-                'price': price if price_type == 'LIMIT' else 'MARKET'
-            }
-        }
+        future = _submit_order(req)
+        try:
+            response = future.result(timeout=2)
+        except FutureTimeoutError:
+            if future.cancel():
+                # Withdrawn before it reached the broker, so a retry is safe
+                logger.warning("Options order for %s timed out in the queue and was withdrawn", req.symbol)
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Order not placed: the order queue is busy, please retry'
+                }), 503
+            # Already sent to the broker; the outcome is not known yet
+            logger.warning("Options order for %s is still being placed", req.symbol)
+            return jsonify({
+                'status': 'pending',
+                'message': f'Options order for {req.symbol} submitted, confirmation pending'
+            }), 202
         
-        logger.info(f"Options order placed by {login_username}: {symbol} {order_type} {quantity}")
-        return jsonify(mock_response)
+        logger.info("Options order placed by %s: %s %s %s", login_username, req.symbol, req.type, req.quantity)
+        return jsonify(response)
         
     except Exception as e:
-        logger.error(f"Error in place_options_order: {str(e)}")
+        logger.error("Error in place_options_order: %s", e)
         return jsonify({
             'status': 'error',
             'message': f'Error placing order: {str(e)}'
@@ -217,24 +389,10 @@ def get_option_greeks():
                 'message': 'Symbol parameter required'
             }), 400
         
-        # Mock Greeks data - in production, this would be calculated or fetched from broker
-        mock_greeks = {
-            'status': 'success',
-            'symbol': symbol,
-            'greeks': {
-                'delta': round(0.3 + (hash(symbol) % 100) / 100 * 0.7, 3),
-                'gamma': round(0.05 + (hash(symbol) % 50) / 1000, 3),
-                'theta': round(-0.02 - (hash(symbol) % 30) / 1000, 3),
-                'vega': round(0.1 + (hash(symbol) % 40) / 1000, 3),
-                'rho': round(0.01 + (hash(symbol) % 20) / 10000, 4)
-            },
-            'last_updated': '2024-01-15T10:30:00+05:30'
-        }
-        
-        return jsonify(mock_greeks)
+        return Response(_greeks_payload(symbol), mimetype='application/json')
         
     except Exception as e:
-        logger.error(f"Error in get_option_greeks: {str(e)}")
+        logger.error("Error in get_option_greeks: %s", e)
         return jsonify({
             'status': 'error',
             'message': f'Error fetching Greeks: {str(e)}'
@@ -247,27 +405,10 @@ def get_market_data():
     try:
         symbol = request.args.get('symbol', 'NIFTY')
         
-        # Mock market data - in production, this would be fetched from real market feeds
-        mock_market_data = {
-            'status': 'success',
-            'symbol': symbol,
-            'data': {
-                'underlying_price': 21832.15,
-                'change': 124.30,
-                'change_percent': 0.57,
-                'pcr_value': 0.87,
-                'max_pain': 21800,
-                'implied_volatility': 18.45,
-                'support_levels': [21750, 21700, 21650],
-                'resistance_levels': [21900, 21950, 22000]
-            },
-            'last_updated': '2024-01-15T10:30:00+05:30'
-        }
-        
-        return jsonify(mock_market_data)
+        return Response(_market_payload(symbol), mimetype='application/json')
         
     except Exception as e:
-        logger.error(f"Error in get_market_data: {str(e)}")
+        logger.error("Error in get_market_data: %s", e)
         return jsonify({
             'status': 'error',
             'message': f'Error fetching market data: {str(e)}'
@@ -277,60 +418,4 @@ def get_market_data():
 @check_session_validity
 def get_option_strategies():
     """API endpoint to fetch available option strategies"""
-    try:
-        strategies = {
-            'status': 'success',
-            'strategies': [
-                {
-                    'id': 'long-straddle',
-                    'name': 'Long Straddle',
-                    'description': 'Buy call and put at the same strike price',
-                    'category': 'volatility',
-                    'legs': [
-                        {'action': 'BUY', 'type': 'CALL', 'strike_offset': 0},
-                        {'action': 'BUY', 'type': 'PUT', 'strike_offset': 0}
-                    ]
-                },
-                {
-                    'id': 'long-strangle',
-                    'name': 'Long Strangle',
-                    'description': 'Buy call and put at different strike prices',
-                    'category': 'volatility',
-                    'legs': [
-                        {'action': 'BUY', 'type': 'CALL', 'strike_offset': 50},
-                        {'action': 'BUY', 'type': 'PUT', 'strike_offset': -50}
-                    ]
-                },
-                {
-                    'id': 'iron-condor',
-                    'name': 'Iron Condor',
-                    'description': 'Sell call and put spreads for range-bound markets',
-                    'category': 'income',
-                    'legs': [
-                        {'action': 'BUY', 'type': 'PUT', 'strike_offset': -100},
-                        {'action': 'SELL', 'type': 'PUT', 'strike_offset': -50},
-                        {'action': 'SELL', 'type': 'CALL', 'strike_offset': 50},
-                        {'action': 'BUY', 'type': 'CALL', 'strike_offset': 100}
-                    ]
-                },
-                {
-                    'id': 'bull-call-spread',
-                    'name': 'Bull Call Spread',
-                    'description': 'Buy lower strike call, sell higher strike call',
-                    'category': 'directional',
-                    'legs': [
-                        {'action': 'BUY', 'type': 'CALL', 'strike_offset': 0},
-                        {'action': 'SELL', 'type': 'CALL', 'strike_offset': 50}
-                    ]
-                }
-            ]
-        }
-        
-        return jsonify(strategies)
-        
-    except Exception as e:
-        logger.error(f"Error in get_option_strategies: {str(e)}")
-        return jsonify({
-            'status': 'error',
-            'message': f'Error fetching strategies: {str(e)}'
-        }), 500
\ No newline at end of file
+    return Response(_STRATEGIES_JSON, mimetype='application/json')
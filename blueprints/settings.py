@@ -1,20 +1,33 @@
 # blueprints/settings.py
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response
 from database.settings_db import get_analyze_mode, set_analyze_mode
 from utils.session import check_session_validity
 from utils.logging import get_logger
+import json
 
 logger = get_logger(__name__)
 
 settings_bp = Blueprint('settings_bp', __name__, url_prefix='/settings')
 
+# Pre-serialized analyze mode responses, keyed by analyze mode
+ANALYZE_MODE_BODIES = {
+    mode: json.dumps({'analyze_mode': mode}, separators=(',', ':'))
+    for mode in (True, False)
+}
+
+# Mode switch confirmation messages, keyed by analyze mode
+MODE_SWITCH_MESSAGES = {
+    True: 'Switched to Analyze Mode',
+    False: 'Switched to Live Mode'
+}
+
 @settings_bp.route('/analyze-mode')
 @check_session_validity
 def get_mode():
     """Get current analyze mode setting"""
     try:
-        return jsonify({'analyze_mode': get_analyze_mode()})
+        return Response(ANALYZE_MODE_BODIES[bool(get_analyze_mode())], mimetype='application/json')
     except Exception as e:
         logger.error(f"Error getting analyze mode: {str(e)}")
         return jsonify({'error': 'Failed to get analyze mode'}), 500
@@ -24,12 +37,12 @@ def get_mode():
 def set_mode(mode):
     """Set analyze mode setting"""
     try:
-        set_analyze_mode(bool(mode))
-        mode_name = 'Analyze' if mode else 'Live'
+        analyze_mode = bool(mode)
+        set_analyze_mode(analyze_mode)
         return jsonify({
             'success': True, 
-            'analyze_mode': bool(mode),
-            'message': f'Switched to {mode_name} Mode'
+            'analyze_mode': analyze_mode,
+            'message': MODE_SWITCH_MESSAGES[analyze_mode]
         })
     except Exception as e:
         logger.error(f"Error setting analyze mode: {str(e)}")
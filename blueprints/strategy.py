@@ -1,33 +1,51 @@
-from flask import Blueprint, render_template, request, jsonify, session, flash, redirect, url_for, abort
+from flask import Blueprint, render_template, request, jsonify, session, flash, redirect, url_for, abort, Response, current_app
 from database.strategy_db import (
     Strategy, StrategySymbolMapping, db_session,
     create_strategy, add_symbol_mapping, get_strategy_by_webhook_id,
     get_symbol_mappings, get_all_strategies, delete_strategy,
     update_strategy_times, delete_symbol_mapping, bulk_add_symbol_mappings,
     toggle_strategy, get_strategy, get_user_strategies, create_custom_strategy,
-    update_strategy_config
+    update_strategy_config, get_strategy_with_mappings, get_strategy_with_mappings_by_webhook_id,
+    get_symbol_map, time_to_minutes
 )
 from database.symbol import enhanced_search_symbols
-from database.auth_db import get_api_key_for_tradingview
+from restx_api.schemas import MAX_BULK_SMART_ORDERS
+from database.auth_db import get_api_key_for_tradingview, db_session as auth_db_session
 from utils.session import check_session_validity, is_session_valid
 from limiter import limiter
 import json
-from datetime import datetime, time
+import csv
+import io
+from datetime import datetime
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
 from utils.logging import get_logger
-import requests
+import httpx
+import asyncio
 import os
-import uuid
-import time as time_module
-import queue
 import threading
 from collections import deque
-from time import time
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+import random
 import re
 
 logger = get_logger(__name__)
 
+# Custom strategy support is optional; the routes degrade if it fails to import
+try:
+    from custom_strategies import StrategyLoader, get_strategy_executor
+    CUSTOM_STRATEGIES_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"Custom strategies unavailable: {str(e)}")
+    CUSTOM_STRATEGIES_AVAILABLE = False
+
+# Shared loader so strategy discovery does not build a new loader per request
+strategy_loader = StrategyLoader() if CUSTOM_STRATEGIES_AVAILABLE else None
+
+# Runs immediate custom strategy executions off the request thread
+custom_strategy_pool = ThreadPoolExecutor(max_workers=8)
+
 # Rate limiting configuration
 WEBHOOK_RATE_LIMIT = os.getenv("WEBHOOK_RATE_LIMIT", "100 per minute")
 STRATEGY_RATE_LIMIT = os.getenv("STRATEGY_RATE_LIMIT", "200 per minute")
@@ -35,9 +53,12 @@ CUSTOM_STRATEGY_RATE_LIMIT = os.getenv("CUSTOM_STRATEGY_RATE_LIMIT", "50 per min
 
 strategy_bp = Blueprint('strategy_bp', __name__, url_prefix='/strategy')
 
+# Indian Standard Time, used for market hours and scheduling
+IST = pytz.timezone('Asia/Kolkata')
+
 # Initialize scheduler for time-based controls
 scheduler = BackgroundScheduler(
-    timezone=pytz.timezone('Asia/Kolkata'),
+    timezone=IST,
     job_defaults={
         'coalesce': True,
         'misfire_grace_time': 300,
@@ -49,113 +70,281 @@ scheduler.start()
 # Get base URL from environment or default to localhost
 BASE_URL = os.getenv('HOST_SERVER', 'http://127.0.0.1:5000')
 
-# Valid exchanges
-VALID_EXCHANGES = ['NSE', 'BSE', 'NFO', 'CDS', 'BFO', 'BCD', 'MCX', 'NCDEX']
+# Valid exchanges (ordered for display, set for membership checks)
+VALID_EXCHANGES_ORDERED = ('NSE', 'BSE', 'NFO', 'CDS', 'BFO', 'BCD', 'MCX', 'NCDEX')
+VALID_EXCHANGES = frozenset(VALID_EXCHANGES_ORDERED)
 
 # Product types per exchange
 EXCHANGE_PRODUCTS = {
-    'NSE': ['MIS', 'CNC'],
-    'BSE': ['MIS', 'CNC'],
-    'NFO': ['MIS', 'NRML'],
-    'CDS': ['MIS', 'NRML'],
-    'BFO': ['MIS', 'NRML'],
-    'BCD': ['MIS', 'NRML'],
-    'MCX': ['MIS', 'NRML'],
-    'NCDEX': ['MIS', 'NRML']
+    'NSE': ('MIS', 'CNC'),
+    'BSE': ('MIS', 'CNC'),
+    'NFO': ('MIS', 'NRML'),
+    'CDS': ('MIS', 'NRML'),
+    'BFO': ('MIS', 'NRML'),
+    'BCD': ('MIS', 'NRML'),
+    'MCX': ('MIS', 'NRML'),
+    'NCDEX': ('MIS', 'NRML')
+}
+
+# Pre-serialized bodies for static webhook and execution error responses
+ERR_INVALID_WEBHOOK = json.dumps({'error': 'Invalid webhook ID'})
+ERR_NOT_CUSTOM = json.dumps({'error': 'Not a custom strategy'})
+ERR_INACTIVE = json.dumps({'error': 'Strategy is inactive'})
+ERR_INVALID_MODE = json.dumps({'error': 'Invalid execution mode'})
+ERR_NO_DATA = json.dumps({'error': 'No data received'})
+ERR_NO_API_KEY = json.dumps({'error': 'No API key found'})
+ERR_INTERNAL = json.dumps({'error': 'Internal server error'})
+
+# Webhook order actions
+VALID_ACTIONS = frozenset({'BUY', 'SELL'})
+
+# Custom strategy execution modes
+VALID_EXECUTION_MODES = frozenset({'immediate', 'queue', 'schedule'})
+
+# Required webhook fields; BOTH mode also needs the target position size
+WEBHOOK_FIELDS = frozenset({'symbol', 'action'})
+WEBHOOK_FIELDS_BOTH = WEBHOOK_FIELDS | {'position_size'}
+
+# Per trading mode: (invalid action error, whether (action, position_size) closes a position).
+# Closing orders are exits for the trading window check and are sent as smart orders.
+# BUY/SELL with position_size=0 in BOTH mode exits the SHORT/LONG position.
+TRADING_MODE_RULES = {
+    'LONG': ('Invalid action for LONG mode. Use BUY to enter, SELL to exit',
+             lambda action, position_size: action == 'SELL'),
+    'SHORT': ('Invalid action for SHORT mode. Use SELL to enter, BUY to exit',
+              lambda action, position_size: action == 'BUY'),
+    'BOTH': ('Invalid action. Use BUY or SELL',
+             lambda action, position_size: position_size == 0)
 }
 
 # Default values
 DEFAULT_EXCHANGE = 'NSE'
 DEFAULT_PRODUCT = 'MIS'
 
-# Separate queues for different order types
-regular_order_queue = queue.Queue()  # For placeorder (up to 10/sec)
-smart_order_queue = queue.Queue()    # For placesmartorder (1/sec)
+# Strategy name and market hours validation constants (times as minutes of day)
+STRATEGY_NAME_RE = re.compile(r'^[A-Za-z0-9\s\-_]+\Z')
+MARKET_OPEN = 9 * 60 + 15    # 09:15
+MARKET_CLOSE = 15 * 60 + 30  # 15:30
+
+# Separate queues for different order types, consumed by the async order dispatcher.
+# Producers append from request threads and wake the dispatcher through its event.
+# The events and the HTTP client are created with each dispatcher loop.
+regular_order_queue = deque()  # For placeorder (up to 10/sec)
+smart_order_queue = deque()    # For placesmartorder (1/sec)
+regular_order_ready = None
+smart_order_ready = None
+
+# Orders beyond this many waiting per queue are rejected rather than buffered
+MAX_QUEUED_ORDERS = 1000
 
 # Order processor state
-order_processor_running = False
+order_processor_loop = None
 order_processor_lock = threading.Lock()
 
-# Rate limiting state for regular orders
-last_regular_orders = deque(maxlen=10)  # Track last 10 regular order timestamps
+# Token bucket for regular orders: refills at 10 tokens/sec and holds at most 10
+REGULAR_ORDER_RATE = 10.0
+regular_order_tokens = REGULAR_ORDER_RATE
+regular_order_last_refill = monotonic()
 
-def process_orders():
-    """Background task to process orders from both queues with rate limiting"""
-    global order_processor_running
-    
+# Pooled keep-alive client shared by all order dispatches
+order_client = None
+
+def new_order_client():
+    """Create the dispatcher's HTTP client"""
+    # No timeout, matching the previous requests.post behaviour: bulk smart
+    # orders can take several seconds.
+    return httpx.AsyncClient(
+        timeout=None,
+        limits=httpx.Limits(max_keepalive_connections=20)
+    )
+
+# Queue endpoints that are dispatched through the 1/sec smart order lane
+SMART_ORDER_ENDPOINTS = ('placesmartorder', 'placesmartorder_bulk')
+
+async def post_order(order, order_kind):
+    """Send a queued order to the local API, returning True on success"""
+    payload = order['payload']
+    path = order['endpoint'].replace('_', '/')  # placesmartorder_bulk -> placesmartorder/bulk
+    if 'orders' in payload:
+        symbols = ', '.join(o['symbol'] for o in payload['orders'])
+    else:
+        symbols = payload['symbol']
+    try:
+        response = await order_client.post(f'{BASE_URL}/api/v1/{path}', json=payload)
+        if response.is_success:
+            if 'orders' in payload:
+                # Bulk requests can partially fail; check each order's result
+                failed = [r.get('symbol') for r in response.json().get('results', []) if r.get('status') != 'success']
+                if failed:
+                    logger.error(f'Error placing {order_kind.lower()} order for {", ".join(failed)}: {response.text}')
+                    return False
+            logger.info(f'{order_kind} order placed for {symbols} in strategy {payload["strategy"]}')
+            return True
+        logger.error(f'Error placing {order_kind.lower()} order for {symbols}: {response.text}')
+    except Exception as e:
+        logger.error(f'Error placing {order_kind.lower()} order: {str(e)}')
+    return False
+
+async def next_order(orders, ready):
+    """Wait for and pop the next order from a dispatch queue"""
+    while not orders:
+        ready.clear()
+        if not orders:
+            await ready.wait()
+    return orders.popleft()
+
+async def process_smart_orders():
+    """Dispatch smart orders one at a time, at most one per second"""
     while True:
-        try:
-            # Process smart orders first (1 per second)
-            try:
-                smart_order = smart_order_queue.get_nowait()
-                if smart_order is None:  # Poison pill
-                    break
-                
-                try:
-                    response = requests.post(f'{BASE_URL}/api/v1/placesmartorder', json=smart_order['payload'])
-                    if response.ok:
-                        logger.info(f'Smart order placed for {smart_order["payload"]["symbol"]} in strategy {smart_order["payload"]["strategy"]}')
-                    else:
-                        logger.error(f'Error placing smart order for {smart_order["payload"]["symbol"]}: {response.text}')
-                except Exception as e:
-                    logger.error(f'Error placing smart order: {str(e)}')
-                
-                # Always wait 1 second after smart order
-                time_module.sleep(1)
-                continue  # Start next iteration
-                
-            except queue.Empty:
-                pass  # No smart orders, continue to regular orders
-            
-            # Process regular orders (up to 10 per second)
-            now = time()
-            
-            # Clean up old timestamps
-            while last_regular_orders and now - last_regular_orders[0] > 1:
-                last_regular_orders.popleft()
-            
-            # Process regular orders if under rate limit
-            if len(last_regular_orders) < 10:
-                try:
-                    regular_order = regular_order_queue.get_nowait()
-                    if regular_order is None:  # Poison pill
-                        break
-                    
-                    try:
-                        response = requests.post(f'{BASE_URL}/api/v1/placeorder', json=regular_order['payload'])
-                        if response.ok:
-                            logger.info(f'Regular order placed for {regular_order["payload"]["symbol"]} in strategy {regular_order["payload"]["strategy"]}')
-                            last_regular_orders.append(now)
-                        else:
-                            logger.error(f'Error placing regular order for {regular_order["payload"]["symbol"]}: {response.text}')
-                    except Exception as e:
-                        logger.error(f'Error placing regular order: {str(e)}')
-                    
-                except queue.Empty:
-                    pass  # No regular orders
-            
-            # Small sleep to prevent CPU spinning
-            time_module.sleep(0.1)
-            
-        except Exception as e:
-            logger.error(f'Error in order processor: {str(e)}')
-            time_module.sleep(1)  # Sleep on error to prevent rapid retries
+        smart_order = await next_order(smart_order_queue, smart_order_ready)
+        await post_order(smart_order, 'Smart')
+        
+        # Always wait 1 second after smart order
+        await asyncio.sleep(1)
+
+async def acquire_regular_order_token():
+    """Wait until the regular order token bucket allows another dispatch"""
+    global regular_order_tokens, regular_order_last_refill
+    while True:
+        now = monotonic()
+        regular_order_tokens = min(
+            REGULAR_ORDER_RATE,
+            regular_order_tokens + (now - regular_order_last_refill) * REGULAR_ORDER_RATE
+        )
+        regular_order_last_refill = now
+        if regular_order_tokens >= 1.0:
+            regular_order_tokens -= 1.0
+            return
+        # Sleep exactly until the next token is available
+        await asyncio.sleep((1.0 - regular_order_tokens) / REGULAR_ORDER_RATE)
+
+async def process_regular_orders():
+    """Dispatch regular orders concurrently, at most 10 per second"""
+    in_flight = set()
+    while True:
+        regular_order = await next_order(regular_order_queue, regular_order_ready)
+        await acquire_regular_order_token()
+        
+        task = asyncio.create_task(post_order(regular_order, 'Regular'))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+async def process_orders():
+    """Background coroutine to process orders from both queues with rate limiting"""
+    await asyncio.gather(
+        process_smart_orders(),
+        process_regular_orders()
+    )
+
+def run_order_processor(loop):
+    """Run the order dispatcher on its own event loop"""
+    global order_processor_loop
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(process_orders())
+    except Exception as e:
+        logger.exception(f'Order processor stopped: {str(e)}')
+    finally:
+        # Let the next queued order start a fresh processor
+        with order_processor_lock:
+            if order_processor_loop is loop:
+                order_processor_loop = None
+        loop.close()
 
 def ensure_order_processor():
-    """Ensure the order processor is running"""
-    global order_processor_running
+    """Ensure the order processor is running and return its event loop"""
+    global order_processor_loop, regular_order_ready, smart_order_ready, order_client
     with order_processor_lock:
-        if not order_processor_running:
-            threading.Thread(target=process_orders, daemon=True).start()
-            order_processor_running = True
+        if order_processor_loop is None:
+            # Events and client are bound to the loop that first uses them
+            regular_order_ready = asyncio.Event()
+            smart_order_ready = asyncio.Event()
+            order_client = new_order_client()
+            order_processor_loop = asyncio.new_event_loop()
+            threading.Thread(target=run_order_processor, args=(order_processor_loop,), daemon=True).start()
+    return order_processor_loop
 
 def queue_order(endpoint, payload):
-    """Add order to appropriate queue"""
-    ensure_order_processor()
-    if endpoint == 'placesmartorder':
-        smart_order_queue.put({'payload': payload})
+    """Add order to appropriate queue, returning False if the queue is full"""
+    loop = ensure_order_processor()
+    if endpoint in SMART_ORDER_ENDPOINTS:
+        orders, ready = smart_order_queue, smart_order_ready
     else:
-        regular_order_queue.put({'payload': payload})
+        orders, ready = regular_order_queue, regular_order_ready
+    
+    if len(orders) >= MAX_QUEUED_ORDERS:
+        logger.error(f'Order queue full, rejecting {endpoint} order for strategy {payload.get("strategy")}')
+        return False
+    
+    orders.append({'endpoint': endpoint, 'payload': payload})
+    loop.call_soon_threadsafe(ready.set)
+    return True
+
+def retry_backoff(attempt):
+    """Jittered exponential backoff delay in seconds for a queueing retry"""
+    return min(0.2 * 2 ** attempt, 2.0) * random.uniform(0.5, 1.0)
+
+def queue_order_with_retry(endpoint, payload, attempts=3):
+    """Queue an order, retrying with jittered exponential backoff while the queue is full"""
+    for attempt in range(attempts):
+        if queue_order(endpoint, payload):
+            return True
+        if attempt < attempts - 1:
+            sleep(retry_backoff(attempt))
+    return False
+
+def queue_orders_bulk_with_retry(orders, attempts=3):
+    """Queue orders in bulk, retrying only the rejected ones together with backoff"""
+    queued = queue_orders_bulk(orders)
+    for attempt in range(attempts - 1):
+        pending = [i for i, ok in enumerate(queued) if not ok]
+        if not pending:
+            break
+        sleep(retry_backoff(attempt))
+        for i, ok in zip(pending, queue_orders_bulk([orders[i] for i in pending])):
+            queued[i] = ok
+    return queued
+
+def queue_orders_bulk(orders):
+    """Add (endpoint, payload) orders in one pass, returning a per-order flag for whether it was queued"""
+    loop = ensure_order_processor()
+    queued = []
+    touched = set()
+    for endpoint, payload in orders:
+        if endpoint in SMART_ORDER_ENDPOINTS:
+            target, ready = smart_order_queue, smart_order_ready
+        else:
+            target, ready = regular_order_queue, regular_order_ready
+        
+        if len(target) >= MAX_QUEUED_ORDERS:
+            logger.error(f'Order queue full, rejecting {endpoint} order for strategy {payload.get("strategy")}')
+            queued.append(False)
+            continue
+        
+        target.append({'endpoint': endpoint, 'payload': payload})
+        touched.add(ready)
+        queued.append(True)
+    
+    # Wake each dispatcher once for the whole batch
+    for ready in touched:
+        loop.call_soon_threadsafe(ready.set)
+    return queued
+
+def json_error(body, status):
+    """Build a JSON error response from a pre-serialized body"""
+    return Response(body, status, mimetype='application/json')
+
+def custom_strategy_executor():
+    """Return the shared custom strategy executor"""
+    if not CUSTOM_STRATEGIES_AVAILABLE:
+        raise RuntimeError('Custom strategies are not available')
+    return get_strategy_executor()
+
+def generate_webhook_id():
+    """Generate a random RFC 4122 version 4 UUID string for a strategy webhook"""
+    h = os.urandom(16).hex()
+    variant = '89ab'[int(h[16], 16) & 3]
+    return f'{h[:8]}-{h[8:12]}-4{h[13:16]}-{variant}{h[17:20]}-{h[20:]}'
 
 def validate_strategy_times(start_time, end_time, squareoff_time):
     """Validate strategy time settings"""
@@ -163,20 +352,23 @@ def validate_strategy_times(start_time, end_time, squareoff_time):
         if not all([start_time, end_time, squareoff_time]):
             return False, "All time fields are required"
         
-        # Convert strings to time objects for comparison
-        start = datetime.strptime(start_time, '%H:%M').time()
-        end = datetime.strptime(end_time, '%H:%M').time()
-        squareoff = datetime.strptime(squareoff_time, '%H:%M').time()
+        # Convert strings to minutes of day for comparison
+        start = time_to_minutes(start_time)
+        end = time_to_minutes(end_time)
+        squareoff = time_to_minutes(squareoff_time)
+        if start is None or end is None or squareoff is None:
+            return False, "Invalid time format. Use HH:MM format"
         
-        # Market hours validation (9:15 AM to 3:30 PM)
-        market_open = datetime.strptime('09:15', '%H:%M').time()
-        market_close = datetime.strptime('15:30', '%H:%M').time()
+        # Fast path: all constraints hold
+        if MARKET_OPEN <= start < end <= squareoff <= MARKET_CLOSE:
+            return True, None
         
-        if start < market_open:
+        # Market hours validation (9:15 AM to 3:30 PM)
+        if start < MARKET_OPEN:
             return False, "Start time cannot be before market open (9:15)"
-        if end > market_close:
+        if end > MARKET_CLOSE:
             return False, "End time cannot be after market close (15:30)"
-        if squareoff > market_close:
+        if squareoff > MARKET_CLOSE:
             return False, "Square off time cannot be after market close (15:30)"
         if start >= end:
             return False, "Start time must be before end time"
@@ -200,7 +392,7 @@ def validate_strategy_name(name):
         return False, "Strategy name must be between 3 and 50 characters"
     
     # Check characters
-    if not re.match(r'^[A-Za-z0-9\s\-_]+$', name):
+    if not STRATEGY_NAME_RE.match(name):
         return False, "Strategy name can only contain letters, numbers, spaces, hyphens and underscores"
     
     return True, None
@@ -215,11 +407,14 @@ def schedule_squareoff(strategy_id):
         hours, minutes = map(int, strategy.squareoff_time.split(':'))
         job_id = f'squareoff_{strategy_id}'
         
-        # Remove existing job if any
-        if scheduler.get_job(job_id):
-            scheduler.remove_job(job_id)
+        # Skip if the job is already scheduled for the same time
+        existing = scheduler.get_job(job_id)
+        if existing:
+            fields = {field.name: str(field) for field in existing.trigger.fields}
+            if fields['hour'] == str(hours) and fields['minute'] == str(minutes):
+                return
         
-        # Add new job
+        # Add or replace the job
         scheduler.add_job(
             squareoff_positions,
             'cron',
@@ -227,12 +422,24 @@ def schedule_squareoff(strategy_id):
             minute=minutes,
             args=[strategy_id],
             id=job_id,
-            timezone=pytz.timezone('Asia/Kolkata')
+            replace_existing=True,
+            timezone=IST
         )
         logger.info(f'Scheduled squareoff for strategy {strategy_id} at {hours}:{minutes}')
     except Exception as e:
         logger.error(f'Error scheduling squareoff for strategy {strategy_id}: {str(e)}')
 
+# Constant fields of a squareoff order; position_size 0 closes the position
+SQUAREOFF_ORDER_TEMPLATE = {
+    'action': 'SELL',  # Direction doesn't matter for closing
+    'pricetype': 'MARKET',
+    'quantity': '0',
+    'position_size': '0',
+    'price': '0',
+    'trigger_price': '0',
+    'disclosed_quantity': '0'
+}
+
 def squareoff_positions(strategy_id):
     """Square off all positions for intraday strategy"""
     try:
@@ -248,26 +455,24 @@ def squareoff_positions(strategy_id):
             
         # Get all symbol mappings
         mappings = get_symbol_mappings(strategy_id)
+        if not mappings:
+            return
         
+        # Close every mapped symbol through bulk placesmartorder requests
+        # using quantity=0 and position_size=0
+        orders = []
         for mapping in mappings:
-            # Use placesmartorder with quantity=0 and position_size=0 for squareoff
-            payload = {
-                'apikey': api_key,
-                'symbol': mapping.symbol,
-                'exchange': mapping.exchange,
-                'product': mapping.product_type,
-                'strategy': strategy.name,
-                'action': 'SELL',  # Direction doesn't matter for closing
-                'pricetype': 'MARKET',
-                'quantity': '0',
-                'position_size': '0',  # This will close the position
-                'price': '0',
-                'trigger_price': '0',
-                'disclosed_quantity': '0'
-            }
-            
-            # Queue the order instead of executing directly
-            queue_order('placesmartorder', payload)
+            order = SQUAREOFF_ORDER_TEMPLATE.copy()
+            order['symbol'] = mapping.symbol
+            order['exchange'] = mapping.exchange
+            order['product'] = mapping.product_type
+            orders.append(order)
+        
+        # Queue the orders instead of executing directly, within the bulk request size limit
+        for start in range(0, len(orders), MAX_BULK_SMART_ORDERS):
+            payload = {'apikey': api_key, 'strategy': strategy.name, 'orders': orders[start:start + MAX_BULK_SMART_ORDERS]}
+            if not queue_order('placesmartorder_bulk', payload):
+                logger.error(f'Squareoff for strategy {strategy_id} was not queued')
             
     except Exception as e:
         logger.error(f'Error in squareoff_positions for strategy {strategy_id}: {str(e)}')
@@ -346,7 +551,7 @@ def new_strategy():
                 start_time = end_time = squareoff_time = None
             
             # Generate webhook ID
-            webhook_id = str(uuid.uuid4())
+            webhook_id = generate_webhook_id()
             
             # Create strategy with user ID
             strategy = create_strategy(
@@ -377,9 +582,7 @@ def new_strategy():
     
     # For GET request, get available custom strategies
     try:
-        from custom_strategies import StrategyLoader
-        loader = StrategyLoader()
-        available_strategies = loader.get_strategy_list()
+        available_strategies = strategy_loader.get_strategy_list() if strategy_loader else []
     except Exception as e:
         logger.error(f"Error loading custom strategies: {str(e)}")
         available_strategies = []
@@ -426,12 +629,12 @@ def handle_custom_strategy_creation(user_id, name):
             return redirect(url_for('strategy_bp.new_strategy'))
         
         # Validate the strategy file exists and is valid
-        from custom_strategies import StrategyLoader, StrategyValidator
-        loader = StrategyLoader()
-        validator = StrategyValidator()
+        if not strategy_loader:
+            flash('Custom strategies are not available', 'error')
+            return redirect(url_for('strategy_bp.new_strategy'))
         
-        # Check if strategy file exists
-        strategy_class = loader.load_strategy(
+        # Check if strategy file exists (reload so edits to the file are picked up)
+        strategy_class = strategy_loader.reload_strategy(
             strategy_file.replace('.py', ''), 
             strategy_category
         )
@@ -441,12 +644,12 @@ def handle_custom_strategy_creation(user_id, name):
             return redirect(url_for('strategy_bp.new_strategy'))
         
         # Validate the strategy class
-        if not loader.validate_strategy(strategy_class):
+        if not strategy_loader.validate_strategy(strategy_class):
             flash('Strategy class validation failed', 'error')
             return redirect(url_for('strategy_bp.new_strategy'))
         
         # Generate webhook ID
-        webhook_id = str(uuid.uuid4())
+        webhook_id = generate_webhook_id()
         
         # Create custom strategy
         strategy = create_custom_strategy(
@@ -466,8 +669,7 @@ def handle_custom_strategy_creation(user_id, name):
             # If it's a scheduled strategy, set up the schedule
             if execution_mode == 'schedule':
                 try:
-                    from custom_strategies import get_strategy_executor
-                    executor = get_strategy_executor()
+                    executor = custom_strategy_executor()
                     executor.schedule_strategy_execution(strategy.id, schedule_config)
                 except Exception as e:
                     logger.error(f"Error scheduling strategy: {str(e)}")
@@ -489,23 +691,17 @@ def view_strategy(strategy_id):
     if not is_session_valid():
         return redirect(url_for('auth.login'))
     
-    strategy = get_strategy(strategy_id)
+    # Ownership is enforced by the lookup itself
+    strategy, symbol_mappings = get_strategy_with_mappings(strategy_id, session.get('user'))
     if not strategy:
         flash('Strategy not found', 'error')
         return redirect(url_for('strategy_bp.index'))
     
-    if strategy.user_id != session.get('user'):
-        flash('Unauthorized access', 'error')
-        return redirect(url_for('strategy_bp.index'))
-    
-    symbol_mappings = get_symbol_mappings(strategy_id)
-    
     # Get execution history for custom strategies
     execution_history = []
     if strategy.strategy_type == 'custom':
         try:
-            from custom_strategies import get_strategy_executor
-            executor = get_strategy_executor()
+            executor = custom_strategy_executor()
             execution_history = executor.get_execution_history(strategy_id, limit=10)
         except Exception as e:
             logger.error(f"Error getting execution history: {str(e)}")
@@ -531,8 +727,7 @@ def toggle_strategy_route(strategy_id):
                 # For custom strategies with scheduled execution, start the schedule
                 if strategy.strategy_type == 'custom' and strategy.execution_mode == 'schedule':
                     try:
-                        from custom_strategies import get_strategy_executor
-                        executor = get_strategy_executor()
+                        executor = custom_strategy_executor()
                         if strategy.schedule_config:
                             executor.schedule_strategy_execution(strategy_id, strategy.schedule_config)
                     except Exception as e:
@@ -549,8 +744,7 @@ def toggle_strategy_route(strategy_id):
                 # For custom strategies, cancel scheduled execution
                 if strategy.strategy_type == 'custom':
                     try:
-                        from custom_strategies import get_strategy_executor
-                        executor = get_strategy_executor()
+                        executor = custom_strategy_executor()
                         executor.cancel_scheduled_strategy(strategy_id)
                     except Exception as e:
                         logger.error(f"Error cancelling custom strategy schedule: {str(e)}")
@@ -592,8 +786,7 @@ def delete_strategy_route(strategy_id):
         # For custom strategies, cancel scheduled execution
         if strategy.strategy_type == 'custom':
             try:
-                from custom_strategies import get_strategy_executor
-                executor = get_strategy_executor()
+                executor = custom_strategy_executor()
                 executor.cancel_scheduled_strategy(strategy_id)
             except Exception as e:
                 logger.error(f"Error cancelling custom strategy schedule: {str(e)}")
@@ -616,14 +809,11 @@ def configure_symbols(strategy_id):
         flash('Session expired. Please login again.', 'error')
         return redirect(url_for('auth.login'))
         
-    strategy = get_strategy(strategy_id)
+    # Ownership is enforced by the lookup itself
+    strategy, symbol_mappings = get_strategy_with_mappings(strategy_id, user_id)
     if not strategy:
         abort(404)
     
-    # Check if strategy belongs to user
-    if strategy.user_id != user_id:
-        abort(403)
-    
     if request.method == 'POST':
         try:
             # Get data from either JSON or form
@@ -639,21 +829,21 @@ def configure_symbols(strategy_id):
                 symbols_text = data.get('symbols')
                 mappings = []
                 
-                for line in symbols_text.strip().split('\n'):
-                    if not line.strip():
+                for row in csv.reader(io.StringIO(symbols_text)):
+                    if not row or not ''.join(row).strip():
                         continue
                     
-                    parts = line.strip().split(',')
-                    if len(parts) != 4:
-                        raise ValueError(f'Invalid format in line: {line}')
+                    if len(row) != 4:
+                        raise ValueError(f'Invalid format in line: {",".join(row)}')
                     
-                    symbol, exchange, quantity, product = parts
+                    symbol, exchange, quantity, product = row
+                    exchange = exchange.strip()
                     if exchange not in VALID_EXCHANGES:
                         raise ValueError(f'Invalid exchange: {exchange}')
                     
                     mappings.append({
                         'symbol': symbol.strip(),
-                        'exchange': exchange.strip(),
+                        'exchange': exchange,
                         'quantity': int(quantity),
                         'product_type': product.strip()
                     })
@@ -708,11 +898,10 @@ def configure_symbols(strategy_id):
             logger.error(f'Error configuring symbols: {error_msg}')
             return jsonify({'status': 'error', 'error': error_msg}), 400
     
-    symbol_mappings = get_symbol_mappings(strategy_id)
     return render_template('strategy/configure_symbols.html', 
                          strategy=strategy, 
                          symbol_mappings=symbol_mappings,
-                         exchanges=VALID_EXCHANGES)
+                         exchanges=VALID_EXCHANGES_ORDERED)
 
 @strategy_bp.route('/<int:strategy_id>/symbol/<int:mapping_id>/delete', methods=['POST'])
 @check_session_validity
@@ -765,55 +954,52 @@ def execute_custom_strategy(webhook_id):
         # Get strategy by webhook ID
         strategy = get_strategy_by_webhook_id(webhook_id)
         if not strategy:
-            return jsonify({'error': 'Invalid webhook ID'}), 404
+            return json_error(ERR_INVALID_WEBHOOK, 404)
         
         # Check if it's a custom strategy
         if strategy.strategy_type != 'custom':
-            return jsonify({'error': 'Not a custom strategy'}), 400
+            return json_error(ERR_NOT_CUSTOM, 400)
         
         # Check if strategy is active
         if not strategy.is_active:
-            return jsonify({'error': 'Strategy is inactive'}), 400
+            return json_error(ERR_INACTIVE, 400)
         
-        # Get execution mode from query parameters or use strategy default
-        execution_mode = request.args.get('mode', strategy.execution_mode)
+        # Execution mode from query parameters or strategy default, parameters from the body
+        return execute_validated_custom_strategy(
+            strategy,
+            request.args.get('mode', strategy.execution_mode),
+            request.get_json(silent=True) or {}
+        )
         
+    except Exception as e:
+        logger.error(f'Error executing custom strategy {webhook_id}: {str(e)}')
+        return jsonify({
+            'status': 'error',
+            'error': 'Internal server error'
+        }), 500
+
+def execute_validated_custom_strategy(strategy, execution_mode, strategy_params):
+    """Execute an active custom strategy that has already been looked up and checked"""
+    try:
         # Validate execution mode
-        if execution_mode not in ['immediate', 'queue', 'schedule']:
-            return jsonify({'error': 'Invalid execution mode'}), 400
+        if execution_mode not in VALID_EXECUTION_MODES:
+            return json_error(ERR_INVALID_MODE, 400)
         
-        # Get additional parameters from request
-        strategy_params = request.json if request.is_json else {}
-        
-        # Import and get strategy executor
-        from custom_strategies import get_strategy_executor
-        executor = get_strategy_executor()
+        # Get strategy executor
+        executor = custom_strategy_executor()
         
         # Execute based on mode
         if execution_mode == 'immediate':
-            result = executor.execute_strategy_immediate(
-                strategy.id, 
-                strategy_params=strategy_params
+            # Run in the background; results are recorded in the execution history
+            custom_strategy_pool.submit(
+                run_custom_strategy, current_app._get_current_object(), executor,
+                strategy.id, strategy.name, strategy.user_id, strategy_params
             )
             
-            if result.success:
-                # Process the signals - place orders for returned symbols
-                order_results = process_strategy_signals(strategy, result.signals)
-                
-                return jsonify({
-                    'status': 'success',
-                    'message': f'Strategy executed successfully',
-                    'signals': result.signals,
-                    'execution_time': result.execution_time,
-                    'orders_placed': len(order_results),
-                    'execution_logs': result.logs
-                }), 200
-            else:
-                return jsonify({
-                    'status': 'error',
-                    'error': result.error,
-                    'execution_logs': result.logs
-                }), 500
+            return jsonify({
+                'status': 'success',
+                'message': 'Strategy execution started'
+            }), 202
                 
         elif execution_mode == 'queue':
             success = executor.execute_strategy_queue(
@@ -857,63 +1043,90 @@ def execute_custom_strategy(webhook_id):
                 }), 500
                 
     except Exception as e:
-        logger.error(f'Error executing custom strategy {webhook_id}: {str(e)}')
+        logger.error(f'Error executing custom strategy {strategy.id}: {str(e)}')
         return jsonify({
             'status': 'error',
             'error': 'Internal server error'
         }), 500
 
-def process_strategy_signals(strategy, signals):
+def run_custom_strategy(app, executor, strategy_id, strategy_name, user_id, strategy_params):
+    """Execute a custom strategy on a pool thread and queue orders for the signals it returns"""
+    with app.app_context():
+        try:
+            result = executor.execute_strategy_immediate(strategy_id, strategy_params=strategy_params)
+            if result.success:
+                order_results = process_strategy_signals(strategy_id, strategy_name, user_id, result.signals)
+                queued_count = sum(order['status'] == 'queued' for order in order_results)
+                logger.info(f'Custom strategy {strategy_name} executed in {result.execution_time:.2f}s, {queued_count} orders queued')
+            else:
+                logger.error(f'Custom strategy {strategy_name} failed: {result.error}')
+        except Exception as e:
+            logger.error(f'Error running custom strategy {strategy_id}: {str(e)}')
+        finally:
+            # Pool threads are reused, so release their scoped DB sessions
+            db_session.remove()
+            auth_db_session.remove()
+
+def process_strategy_signals(strategy_id, strategy_name, user_id, signals):
     """Process trading signals from custom strategy"""
     try:
         if not signals:
             return []
         
         # Get API key for the user
-        api_key = get_api_key_for_tradingview(strategy.user_id)
+        api_key = get_api_key_for_tradingview(user_id)
         if not api_key:
-            logger.error(f'No API key found for strategy {strategy.id}')
+            logger.error(f'No API key found for strategy {strategy_id}')
             return []
         
-        # Get symbol mappings for the strategy
-        mappings = get_symbol_mappings(strategy.id)
-        symbol_map = {mapping.symbol: mapping for mapping in mappings}
+        # Get cached symbol map for the strategy
+        symbol_map = get_symbol_map(strategy_id)
+        
+        # Fields shared by every order from this run
+        base_payload = {
+            'apikey': api_key,
+            'strategy': strategy_name,
+            'action': 'BUY',  # Default action, can be customized
+            'pricetype': 'MARKET',
+            'price': '0',
+            'trigger_price': '0',
+            'disclosed_quantity': '0'
+        }
         
+        batch = []
         order_results = []
         
         for symbol in signals:
             # Check if we have a mapping for this symbol
-            if symbol not in symbol_map:
-                logger.warning(f'No mapping found for symbol {symbol} in strategy {strategy.id}')
+            mapping = symbol_map.get(symbol)
+            if mapping is None:
+                logger.warning(f'No mapping found for symbol {symbol} in strategy {strategy_id}')
                 continue
             
-            mapping = symbol_map[symbol]
-            
             # Prepare order payload
             payload = {
-                'apikey': api_key,
+                **base_payload,
                 'symbol': mapping.symbol,
                 'exchange': mapping.exchange,
                 'product': mapping.product_type,
-                'strategy': strategy.name,
-                'action': 'BUY',  # Default action, can be customized
-                'quantity': str(mapping.quantity),
-                'pricetype': 'MARKET',
-                'price': '0',
-                'trigger_price': '0',
-                'disclosed_quantity': '0'
+                'quantity': mapping.quantity_str
             }
             
-            # Queue the order
-            queue_order('placeorder', payload)
+            batch.append(('placeorder', payload))
             order_results.append({
                 'symbol': symbol,
                 'action': 'BUY',
-                'quantity': mapping.quantity,
-                'status': 'queued'
+                'quantity': mapping.quantity
             })
-            
-            logger.info(f'Queued order for {symbol} from custom strategy {strategy.name}')
+        
+        # Queue all orders in one pass
+        # Rejected orders are retried as one batch, so backoff is paid once per attempt
+        for result, queued in zip(order_results, queue_orders_bulk_with_retry(batch)):
+            result['status'] = 'queued' if queued else 'retry_failed'
+        
+        queued_count = sum(result['status'] == 'queued' for result in order_results)
+        if queued_count:
+            logger.info(f'Queued {queued_count} orders from custom strategy {strategy_name}')
         
         return order_results
         
@@ -926,9 +1139,7 @@ def process_strategy_signals(strategy, signals):
 def get_available_custom_strategies():
     """Get list of available custom strategies"""
     try:
-        from custom_strategies import StrategyLoader
-        loader = StrategyLoader()
-        strategies = loader.get_strategy_list()
+        strategies = strategy_loader.get_strategy_list() if strategy_loader else []
         
         return jsonify({
             'status': 'success',
@@ -955,11 +1166,10 @@ def get_custom_strategy_status(strategy_id):
             return jsonify({'error': 'Strategy not found'}), 404
         
         if strategy.strategy_type != 'custom':
-            return jsonify({'error': 'Not a custom strategy'}), 400
+            return json_error(ERR_NOT_CUSTOM, 400)
         
         # Get execution status
-        from custom_strategies import get_strategy_executor
-        executor = get_strategy_executor()
+        executor = custom_strategy_executor()
         
         execution_history = executor.get_execution_history(strategy_id, limit=10)
         queue_status = executor.get_queue_status()
@@ -994,99 +1204,74 @@ def get_custom_strategy_status(strategy_id):
 def webhook(webhook_id):
     """Handle webhook from trading platform"""
     try:
-        strategy = get_strategy_by_webhook_id(webhook_id)
+        strategy, mappings = get_strategy_with_mappings_by_webhook_id(webhook_id)
         if not strategy:
-            return jsonify({'error': 'Invalid webhook ID'}), 404
+            return json_error(ERR_INVALID_WEBHOOK, 404)
         
         if not strategy.is_active:
-            return jsonify({'error': 'Strategy is inactive'}), 400
+            return json_error(ERR_INACTIVE, 400)
         
-        # Handle custom strategy webhook
+        # Handle custom strategy webhook; the strategy is already loaded and active
         if strategy.strategy_type == 'custom':
-            # For custom strategies, trigger execution via the custom strategy endpoint
-            return execute_custom_strategy(webhook_id)
+            return execute_validated_custom_strategy(
+                strategy,
+                request.args.get('mode', strategy.execution_mode),
+                request.get_json(silent=True) or {}
+            )
         
         # Continue with existing webhook logic for traditional strategies
-        # Check trading hours for intraday strategies
-        if strategy.is_intraday:
-            now = datetime.now(pytz.timezone('Asia/Kolkata'))
-            current_time = now.strftime('%H:%M')
-            
-            # Determine if this is an entry or exit order
-            data = request.get_json()
-            if not data:
-                return jsonify({'error': 'No data received'}), 400
-            
-            action = data['action'].upper()
-            position_size = int(data.get('position_size', 0))
-            
-            is_exit_order = False
-            if strategy.trading_mode == 'LONG':
-                is_exit_order = action == 'SELL'
-            elif strategy.trading_mode == 'SHORT':
-                is_exit_order = action == 'BUY'
-            else:  # BOTH mode
-                is_exit_order = position_size == 0
-            
-            # For entry orders, check if within entry time window
-            if not is_exit_order:
-                if strategy.start_time and current_time < strategy.start_time:
-                    return jsonify({'error': 'Entry orders not allowed before start time'}), 400
-                
-                if strategy.end_time and current_time > strategy.end_time:
-                    return jsonify({'error': 'Entry orders not allowed after end time'}), 400
-            
-            # For exit orders, check if within exit time window (up to square off time)
-            else:
-                if strategy.start_time and current_time < strategy.start_time:
-                    return jsonify({'error': 'Exit orders not allowed before start time'}), 400
-                
-                if strategy.squareoff_time and current_time > strategy.squareoff_time:
-                    return jsonify({'error': 'Exit orders not allowed after square off time'}), 400
-        
-        # Parse webhook data
-        data = request.get_json()
+        # Parse webhook data once
+        data = request.get_json(silent=True)
         if not data:
-            return jsonify({'error': 'No data received'}), 400
+            return json_error(ERR_NO_DATA, 400)
         
         # Validate required fields
-        required_fields = ['symbol', 'action']
-        if strategy.trading_mode == 'BOTH':
-            required_fields.append('position_size')
-            
-        missing_fields = [field for field in required_fields if field not in data]
+        required_fields = WEBHOOK_FIELDS_BOTH if strategy.trading_mode == 'BOTH' else WEBHOOK_FIELDS
+        missing_fields = sorted(required_fields - data.keys())
         if missing_fields:
             return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
             
         # Validate action based on trading mode
         action = data['action'].upper()
         position_size = int(data.get('position_size', 0))
+        invalid_action_error, closes_position = TRADING_MODE_RULES.get(strategy.trading_mode, TRADING_MODE_RULES['BOTH'])
         
-        if strategy.trading_mode == 'LONG':
-            if action not in ['BUY', 'SELL']:
-                return jsonify({'error': 'Invalid action for LONG mode. Use BUY to enter, SELL to exit'}), 400
-            use_smart_order = action == 'SELL'
-        elif strategy.trading_mode == 'SHORT':
-            if action not in ['BUY', 'SELL']:
-                return jsonify({'error': 'Invalid action for SHORT mode. Use SELL to enter, BUY to exit'}), 400
-            use_smart_order = action == 'BUY'
-        else:  # BOTH mode
-            if action not in ['BUY', 'SELL']:
-                return jsonify({'error': 'Invalid action. Use BUY or SELL'}), 400
-            
+        if action not in VALID_ACTIONS:
+            return jsonify({'error': invalid_action_error}), 400
+        
+        if strategy.trading_mode not in ('LONG', 'SHORT'):  # BOTH mode
             # Validate position size based on action
             if action == 'BUY' and position_size < 0:
                 return jsonify({'error': 'For BUY orders in BOTH mode, position_size must be >= 0'}), 400
             if action == 'SELL' and position_size > 0:
                 return jsonify({'error': 'For SELL orders in BOTH mode, position_size must be <= 0'}), 400
+        
+        # Exit orders are sent as smart orders that close the position
+        use_smart_order = closes_position(action, position_size)
+        
+        # Check trading hours for intraday strategies
+        if strategy.is_intraday:
+            now = datetime.now(IST)
+            current_minutes = now.hour * 60 + now.minute
             
-            # Smart order logic:
-            # - BUY with position_size=0 means exit SHORT position
-            # - SELL with position_size=0 means exit LONG position
-            use_smart_order = position_size == 0
+            # For entry orders, check if within entry time window
+            if not use_smart_order:
+                if strategy.start_minutes is not None and current_minutes < strategy.start_minutes:
+                    return jsonify({'error': 'Entry orders not allowed before start time'}), 400
+                
+                if strategy.end_minutes is not None and current_minutes > strategy.end_minutes:
+                    return jsonify({'error': 'Entry orders not allowed after end time'}), 400
+            
+            # For exit orders, check if within exit time window (up to square off time)
+            else:
+                if strategy.start_minutes is not None and current_minutes < strategy.start_minutes:
+                    return jsonify({'error': 'Exit orders not allowed before start time'}), 400
+                
+                if strategy.squareoff_minutes is not None and current_minutes > strategy.squareoff_minutes:
+                    return jsonify({'error': 'Exit orders not allowed after square off time'}), 400
             
         # Get symbol mapping
-        mapping = next((m for m in get_symbol_mappings(strategy.id) if m.symbol == data['symbol']), None)
+        mapping = get_symbol_map(strategy.id, mappings).get(data['symbol'])
         if not mapping:
             return jsonify({'error': f'No mapping found for symbol {data["symbol"]}'}), 400
             
@@ -1094,7 +1279,7 @@ def webhook(webhook_id):
         api_key = get_api_key_for_tradingview(strategy.user_id)
         if not api_key:
             logger.error(f'No API key found for user {strategy.user_id}')
-            return jsonify({'error': 'No API key found'}), 401
+            return json_error(ERR_NO_API_KEY, 401)
 
         # Prepare order payload
         payload = {
@@ -1111,7 +1296,7 @@ def webhook(webhook_id):
         if strategy.trading_mode == 'BOTH':
             # For BOTH mode, always use placesmartorder with direct position size
             # Set quantity to 0 if position_size is 0 (for exits)
-            quantity = '0' if position_size == 0 else str(mapping.quantity)
+            quantity = '0' if position_size == 0 else mapping.quantity_str
             payload.update({
                 'quantity': quantity,
                 'position_size': str(position_size),  # Use position_size directly from webhook data
@@ -1140,9 +1325,10 @@ def webhook(webhook_id):
                 endpoint = 'placeorder'
             
         # Queue the order
-        queue_order(endpoint, payload)
+        if not queue_order_with_retry(endpoint, payload):
+            return jsonify({'error': 'Order queue is full, try again later'}), 503
         return jsonify({'message': f'Order queued successfully for {data["symbol"]}'}), 200
             
     except Exception as e:
         logger.error(f'Error processing webhook: {str(e)}')
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_error(ERR_INTERNAL, 500)
@@ -1,74 +1,182 @@
+import asyncio
 import httpx
-import json
+import orjson
 import os
+import threading
+from cachetools import TTLCache
 import pandas as pd
 from datetime import datetime, timedelta
 import urllib.parse
 from database.token_db import get_token, get_br_symbol, get_oa_symbol
-from utils.httpx_client import get_httpx_client
+from utils.httpx_client import get_httpx_client, HTTP2_AVAILABLE
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Flattrade candle fields mapped to OpenAlgo column names
+CANDLE_COLUMNS = {'into': 'open', 'inth': 'high', 'intl': 'low', 'intc': 'close', 'intv': 'volume'}
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+# TPSeries candle time, e.g. "02-06-2020 15:46:23"
+INTRADAY_TIME_FORMAT = '%d-%m-%Y %H:%M:%S'
+# Column order of the history DataFrame, matching the Angel format
+HISTORY_COLUMNS = ['close', 'high', 'low', 'open', 'timestamp', 'volume', 'oi']
+
+# OpenAlgo index exchanges served by the underlying Flattrade exchange
+INDEX_EXCHANGES = {'NSE_INDEX': 'NSE', 'BSE_INDEX': 'BSE'}
+
+# Map common timeframe format to Flattrade resolutions
+TIMEFRAME_MAP = {
+    # Minutes
+    '1m': '1',    # 1 minute
+    '3m': '3',    # 3 minutes
+    '5m': '5',    # 5 minutes
+    '10m': '10',  # 10 minutes
+    '15m': '15',  # 15 minutes
+    '30m': '30',  # 30 minutes
+    # Hours
+    '1h': '60',   # 1 hour (60 minutes)
+    '2h': '120',  # 2 hours (120 minutes)
+    # Daily
+    'D': 'D'      # Daily data
+}
+INTERVALS = tuple(TIMEFRAME_MAP)
+
+# Five-level depth field names: bid/ask price and quantity
+BP_KEYS = ('bp1', 'bp2', 'bp3', 'bp4', 'bp5')
+BQ_KEYS = ('bq1', 'bq2', 'bq3', 'bq4', 'bq5')
+SP_KEYS = ('sp1', 'sp2', 'sp3', 'sp4', 'sp5')
+SQ_KEYS = ('sq1', 'sq2', 'sq3', 'sq4', 'sq5')
+
+# Quotes are reused for a second so history's today-candle and strategy polls share one request
+quote_cache = TTLCache(maxsize=1024, ttl=1)
+quote_cache_lock = threading.Lock()
+
+HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+BASE_URL = "https://piconnect.flattrade.in"
+
+# Flattrade user id, the part of BROKER_API_KEY before ':::'
+API_KEY = None
+# Serialized '{"uid":...,"actid":...' with the closing brace left open for the request fields
+UID_PREFIX = None
+
+
+def load_api_key():
+    """(Re)read BROKER_API_KEY from the environment"""
+    global API_KEY, UID_PREFIX
+    API_KEY = os.getenv('BROKER_API_KEY', '').split(':::')[0]
+    UID_PREFIX = orjson.dumps({"uid": API_KEY, "actid": API_KEY})[:-1]
+
+
+load_api_key()
+
+
+def build_request_body(auth, payload=None):
+    """Encode a Flattrade jData/jKey request body with uid and actid filled in"""
+    if payload:
+        # Splice the request fields in after the precomputed uid/actid pair
+        data = UID_PREFIX + b"," + orjson.dumps(payload)[1:]
+    else:
+        data = UID_PREFIX + b"}"
+
+    return b"jData=" + data + b"&jKey=" + auth.encode()
+
+
+def numeric_candles(df, columns):
+    """Coerce candle fields to float64, treating missing fields as 0 and dropping candles with malformed values"""
+    values = df[columns].fillna(0).apply(pd.to_numeric, errors='coerce')
+    valid = values.notna().all(axis=1)
+    if not valid.all():
+        logger.error(f"Skipping {int((~valid).sum())} candles with malformed values")
+    return df[valid].assign(**values[valid].astype('float64'))
+
+
+def parse_eod_candles(candles):
+    """Build the daily history frame from EODChartData candles"""
+    df = pd.DataFrame(candles).rename(columns=CANDLE_COLUMNS)
+    if df.empty:
+        return df
+
+    df = df.reindex(columns=['ssboe', *PRICE_COLUMNS, 'volume', 'oi'])
+    df = numeric_candles(df, list(df.columns))
+    # EOD data carries the epoch in 'ssboe'
+    df['timestamp'] = df['ssboe'].astype('int64')
+    df[['volume', 'oi']] = df[['volume', 'oi']].astype('int64')
+    return df
+
+
+def parse_intraday_candles(candles):
+    """Build the intraday history frame from TPSeries candles"""
+    df = pd.DataFrame(candles).rename(columns=CANDLE_COLUMNS)
+    if df.empty:
+        return df
+
+    df = numeric_candles(df.reindex(columns=['time', *PRICE_COLUMNS, 'volume', 'oi']), [*PRICE_COLUMNS, 'volume', 'oi'])
+
+    # Intraday format: "02-06-2020 15:46:23", interpreted in server local time
+    times = pd.to_datetime(df['time'], format=INTRADAY_TIME_FORMAT, errors='coerce', cache=True)
+    valid = times.notna()
+    if not valid.all():
+        logger.info(f"Skipping {int((~valid).sum())} candles with unparseable timestamps")
+
+    # Skip candles with all zero values
+    valid &= (df[PRICE_COLUMNS] != 0).any(axis=1)
+    local_tz = datetime.now().astimezone().tzinfo
+    df = df[valid].assign(
+        timestamp=times[valid].dt.tz_localize(local_tz).astype('int64') // 10**9
+    )
+    df[['volume', 'oi']] = df[['volume', 'oi']].astype('int64')
+    return df
+
+
+def format_quote(response):
+    """Convert a Flattrade GetQuotes response into the OpenAlgo quote dict"""
+    if response.get('stat') != 'Ok':
+        raise Exception(f"Error from Flattrade API: {response.get('emsg', 'Unknown error')}")
+
+    # Return simplified quote data as dict (not list) - NOW INCLUDING OI
+    return {
+        'bid': float(response.get('bp1', 0)),
+        'ask': float(response.get('sp1', 0)), 
+        'open': float(response.get('o', 0)),
+        'high': float(response.get('h', 0)),
+        'low': float(response.get('l', 0)),
+        'ltp': float(response.get('lp', 0)),
+        'prev_close': float(response['c']) if 'c' in response else 0,
+        'volume': int(float(response.get('v', 0))),
+        'oi': int(response.get('oi', 0))  # 🔥 ADDED OPEN INTEREST
+    }
+
 
 def get_api_response(endpoint, auth, method="POST", payload=None):
     """
     Common function to make API calls to Flattrade using httpx with connection pooling
     """
-    AUTH_TOKEN = auth
-    full_api_key = os.getenv('BROKER_API_KEY')
-    api_key = full_api_key.split(':::')[0]
-
-    if payload is None:
-        data = {
-            "uid": api_key,
-            "actid": api_key
-        }
-    else:
-        data = payload
-        data["uid"] = api_key
-        data["actid"] = api_key
-
-    payload_str = "jData=" + json.dumps(data) + "&jKey=" + AUTH_TOKEN
+    payload_str = build_request_body(auth, payload)
 
     # Get the shared httpx client
     client = get_httpx_client()
     
-    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-    url = f"https://piconnect.flattrade.in{endpoint}"
+    url = BASE_URL + endpoint
 
-    response = client.request(method, url, content=payload_str, headers=headers)
-    data = response.text
+    response = client.request(method, url, content=payload_str, headers=HEADERS)
     
     # Print raw response for debugging
-    logger.info(f"Raw Response: {data}")
+    logger.debug("Raw Response: %s", response.content)
     
     try:
-        return json.loads(data)
-    except json.JSONDecodeError as e:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
         logger.error(f"Error decoding JSON: {e}")
-        logger.info(f"Response data: {data}")
+        logger.info(f"Response data: {response.text}")
         raise
 
 class BrokerData:
+    # Shared module map, still exposed per instance for the intervals service
+    timeframe_map = TIMEFRAME_MAP
+
     def __init__(self, auth_token):
         """Initialize Flattrade data handler with authentication token"""
         self.auth_token = auth_token
-        # Map common timeframe format to Flattrade resolutions
-        self.timeframe_map = {
-            # Minutes
-            '1m': '1',    # 1 minute
-            '3m': '3',    # 3 minutes
-            '5m': '5',    # 5 minutes
-            '10m': '10',  # 10 minutes
-            '15m': '15',  # 15 minutes
-            '30m': '30',  # 30 minutes
-            # Hours
-            '1h': '60',   # 1 hour (60 minutes)
-            '2h': '120',  # 2 hours (120 minutes)
-            # Daily
-            'D': 'D'      # Daily data
-        }
 
     def get_quotes(self, symbol: str, exchange: str) -> dict:
         """
@@ -80,42 +188,67 @@ class BrokerData:
             dict: Simplified quote data with required fields including OI
         """
         try:
-            # Convert symbol to broker format and get token
-            br_symbol = get_br_symbol(symbol, exchange)
+            cache_key = (symbol, exchange)
+            with quote_cache_lock:
+                quote = quote_cache.get(cache_key)
+            if quote is not None:
+                return dict(quote)
+
+            # Get token
             token = get_token(symbol, exchange)
 
-            if(exchange=="NSE_INDEX"):
-                exchange="NSE"  
-            elif(exchange=="BSE_INDEX"):
-                exchange="BSE"
+            exchange = INDEX_EXCHANGES.get(exchange, exchange)
 
             payload = {
-                "uid": os.getenv('BROKER_API_KEY').split(':::')[0],
                 "exch": exchange,
                 "token": token
             }
                 
             response = get_api_response("/PiConnectTP/GetQuotes", self.auth_token, payload=payload)
-                
-            if response.get('stat') != 'Ok':
-                raise Exception(f"Error from Flattrade API: {response.get('emsg', 'Unknown error')}")
-            
-            # Return simplified quote data as dict (not list) - NOW INCLUDING OI
-            return {
-                'bid': float(response.get('bp1', 0)),
-                'ask': float(response.get('sp1', 0)), 
-                'open': float(response.get('o', 0)),
-                'high': float(response.get('h', 0)),
-                'low': float(response.get('l', 0)),
-                'ltp': float(response.get('lp', 0)),
-                'prev_close': float(response.get('c', 0)) if 'c' in response else 0,
-                'volume': int(float(response.get('v', 0))),
-                'oi': int(response.get('oi', 0))  # 🔥 ADDED OPEN INTEREST
-            }
+            quote = format_quote(response)
+            with quote_cache_lock:
+                quote_cache[cache_key] = quote
+            return dict(quote)
             
         except Exception as e:
             raise Exception(f"Error fetching quotes: {str(e)}")
 
+    async def get_quotes_many(self, pairs: list, concurrency: int = 16) -> list:
+        """
+        Get real-time quotes for many symbols concurrently
+        Args:
+            pairs: List of (symbol, exchange) tuples
+            concurrency: Maximum number of requests in flight
+        Returns:
+            list: Quote dicts in the same order as pairs
+        """
+        try:
+            # Token lookups hit the database, so resolve them before going async
+            payloads = []
+            for symbol, exchange in pairs:
+                token = get_token(symbol, exchange)
+                exchange = INDEX_EXCHANGES.get(exchange, exchange)
+                payloads.append({"exch": exchange, "token": token})
+
+            sem = asyncio.Semaphore(concurrency)
+            limits = httpx.Limits(max_keepalive_connections=concurrency, max_connections=concurrency)
+
+            # One client per batch: AsyncClient connections are bound to the running event loop
+            async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=limits, timeout=30.0) as client:
+                async def fetch_quote(payload):
+                    async with sem:
+                        response = await client.post(
+                            BASE_URL + "/PiConnectTP/GetQuotes",
+                            content=build_request_body(self.auth_token, payload),
+                            headers=HEADERS
+                        )
+                    return format_quote(orjson.loads(response.content))
+
+                return await asyncio.gather(*[fetch_quote(payload) for payload in payloads])
+
+        except Exception as e:
+            raise Exception(f"Error fetching quotes: {str(e)}")
+
 
     def get_depth(self, symbol: str, exchange: str) -> dict:
         """
@@ -127,17 +260,12 @@ class BrokerData:
             dict: Market depth data with bids, asks and other details
         """
         try:
-            # Convert symbol to broker format and get token
-            br_symbol = get_br_symbol(symbol, exchange)
+            # Get token
             token = get_token(symbol, exchange)
 
-            if(exchange=="NSE_INDEX"):
-                exchange="NSE"  
-            elif(exchange=="BSE_INDEX"):
-                exchange="BSE"
+            exchange = INDEX_EXCHANGES.get(exchange, exchange)
             
             payload = {
-                "uid": os.getenv('BROKER_API_KEY').split(':::')[0],
                 "exch": exchange,
                 "token": token
             }
@@ -147,33 +275,30 @@ class BrokerData:
             if response.get('stat') != 'Ok':
                 raise Exception(f"Error from Flattrade API: {response.get('emsg', 'Unknown error')}")
             
-            # Format bids and asks data
-            bids = []
-            asks = []
-            
             # Process top 5 bids and asks
-            for i in range(1, 6):
-                bids.append({
-                    'price': float(response.get(f'bp{i}', 0)),
-                    'quantity': int(response.get(f'bq{i}', 0))
-                })
-                asks.append({
-                    'price': float(response.get(f'sp{i}', 0)),
-                    'quantity': int(response.get(f'sq{i}', 0))
-                })
+            bid_qty = [int(response.get(key, 0)) for key in BQ_KEYS]
+            ask_qty = [int(response.get(key, 0)) for key in SQ_KEYS]
+            bids = [
+                {'price': float(response.get(key, 0)), 'quantity': qty}
+                for key, qty in zip(BP_KEYS, bid_qty)
+            ]
+            asks = [
+                {'price': float(response.get(key, 0)), 'quantity': qty}
+                for key, qty in zip(SP_KEYS, ask_qty)
+            ]
             
             # Return depth data
             return {
                 'bids': bids,
                 'asks': asks,
-                'totalbuyqty': sum(bid['quantity'] for bid in bids),
-                'totalsellqty': sum(ask['quantity'] for ask in asks),
+                'totalbuyqty': sum(bid_qty),
+                'totalsellqty': sum(ask_qty),
                 'high': float(response.get('h', 0)),
                 'low': float(response.get('l', 0)),
                 'ltp': float(response.get('lp', 0)),
                 'ltq': int(response.get('ltq', 0)),  # Last Traded Quantity
                 'open': float(response.get('o', 0)),
-                'prev_close': float(response.get('c', 0)) if 'c' in response else 0,
+                'prev_close': float(response['c']) if 'c' in response else 0,
                 'volume': int(float(response.get('v', 0))),
                 'oi': int(response.get('oi', 0))  # Open Interest
             }
@@ -198,22 +323,19 @@ class BrokerData:
         """
         try:
             # Check if interval is supported
-            if interval not in self.timeframe_map:
-                supported = list(self.timeframe_map.keys())
-                raise Exception(f"Unsupported interval '{interval}'. Supported intervals are: {', '.join(supported)}")
+            resolution = TIMEFRAME_MAP.get(interval)
+            if resolution is None:
+                raise Exception(f"Unsupported interval '{interval}'. Supported intervals are: {', '.join(INTERVALS)}")
 
             # Convert symbol to broker format and get token
             br_symbol = get_br_symbol(symbol, exchange)
             token = get_token(symbol, exchange)
 
-            if(exchange=="NSE_INDEX"):
-                exchange="NSE"  
-            elif(exchange=="BSE_INDEX"):
-                exchange="BSE"
+            exchange = INDEX_EXCHANGES.get(exchange, exchange)
             
             # Convert dates to epoch timestamps
-            start_ts = int(datetime.strptime(start_date + " 00:00:00", '%Y-%m-%d %H:%M:%S').timestamp())
-            end_ts = int(datetime.strptime(end_date + " 23:59:59", '%Y-%m-%d %H:%M:%S').timestamp())
+            start_ts = int(datetime.fromisoformat(start_date).timestamp())
+            end_ts = int(datetime.fromisoformat(end_date).replace(hour=23, minute=59, second=59).timestamp())
 
             # For daily data, use EODChartData endpoint
             if interval == 'D':
@@ -224,26 +346,25 @@ class BrokerData:
                     "from": str(start_ts),  # Use epoch timestamp
                     "to": str(end_ts)       # Use epoch timestamp
                 }
-                logger.debug(f"EOD Payload: {payload}")  # Debug print
+                logger.debug("EOD Payload: %s", payload)  # Debug print
                 try:
                     response = get_api_response("/PiConnectTP/EODChartData", self.auth_token, payload=payload)
-                    logger.debug(f"EOD Response: {response}")  # Debug print
+                    logger.debug("EOD Response: %s", response)  # Debug print
                 except Exception as e:
                     logger.error(f"Error in EOD request: {e}")
                     response = []  # Continue with empty response to try quotes
             else:
                 # For intraday data, use TPSeries endpoint
                 payload = {
-                    "uid": os.getenv('BROKER_API_KEY').split(':::')[0],
                     "exch": exchange,
                     "token": token,
                     "st": str(start_ts),  # Start time in epoch
                     "et": str(end_ts),    # End time in epoch
-                    "intrv": self.timeframe_map[interval]  # Changed to intrv
+                    "intrv": resolution  # Changed to intrv
                 }
-                logger.debug(f"Intraday Payload: {payload}")  # Debug print
+                logger.debug("Intraday Payload: %s", payload)  # Debug print
                 response = get_api_response("/PiConnectTP/TPSeries", self.auth_token, payload=payload)
-                logger.debug(f"Intraday Response: {response}")  # Debug print
+                logger.debug("Intraday Response: %s", response)  # Debug print
            
             # Check if response is a dict (error case) or list (success case)
             if isinstance(response, dict):
@@ -252,56 +373,18 @@ class BrokerData:
             elif not isinstance(response, list):
                 raise Exception("Invalid response format from Flattrade API")
             
-            # Convert response to DataFrame
-            data = []
-            for candle in response:
-                if isinstance(candle, str):
-                    candle = json.loads(candle)
-                
-                try:
-                    # Parse timestamp based on interval
-                    if interval == 'D':
-                        # EOD data format: "21-SEP-2022"
-                        timestamp = int(candle.get('ssboe', 0))  # Use ssboe for timestamp
-                        data.append({
-                            'timestamp': timestamp,
-                            'open': float(candle.get('into', 0)),   # EOD uses 'into' for open
-                            'high': float(candle.get('inth', 0)),   # EOD uses 'inth' for high
-                            'low': float(candle.get('intl', 0)),    # EOD uses 'intl' for low
-                            'close': float(candle.get('intc', 0)),  # EOD uses 'intc' for close
-                            'volume': int(float(candle.get('intv', 0))),  # EOD uses 'intv' for volume
-                            'oi': int(float(candle.get('oi', 0)))   # Open Interest
-                        })
-                    else:
-                        # Intraday format: "02-06-2020 15:46:23"
-                        try:
-                            timestamp = int(datetime.strptime(candle['time'], '%d-%m-%Y %H:%M:%S').timestamp())
-                        except ValueError:
-                            logger.info(f"Error parsing timestamp: {candle['time']}")
-                            continue
-
-                        # Skip candles with all zero values
-                        if (float(candle.get('into', 0)) == 0 and 
-                            float(candle.get('inth', 0)) == 0 and 
-                            float(candle.get('intl', 0)) == 0 and 
-                            float(candle.get('intc', 0)) == 0):
-                            continue
-
-                        data.append({
-                            'timestamp': timestamp,
-                            'open': float(candle.get('into', 0)),   # Intraday also uses 'into' for open
-                            'high': float(candle.get('inth', 0)),   # Intraday also uses 'inth' for high
-                            'low': float(candle.get('intl', 0)),    # Intraday also uses 'intl' for low
-                            'close': float(candle.get('intc', 0)),  # Intraday also uses 'intc' for close
-                            'volume': int(float(candle.get('intv', 0))),  # Intraday also uses 'intv' for volume
-                            'oi': int(float(candle.get('oi', 0)))   # Open Interest
-                        })
-                except (KeyError, ValueError) as e:
-                    logger.error(f"Error parsing candle data: {e}, Candle: {candle}")
-                    continue
-            df = pd.DataFrame(data)
-            if df.empty:
-                df = pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'oi'])
+            # Convert response to DataFrame in one pass; candles may arrive as JSON strings
+            candles = response if isinstance(response, list) else []
+            if candles and isinstance(candles[0], str):
+                candles = [orjson.loads(candle) for candle in candles]
+            if interval == 'D':
+                df = parse_eod_candles(candles)
+            else:
+                df = parse_intraday_candles(candles)
+
+            # Flattrade returns candles newest first; flip instead of sorting
+            if not df.empty and df['timestamp'].is_monotonic_decreasing:
+                df = df.iloc[::-1].reset_index(drop=True)
             
             # For daily data, append today's data from quotes if it's missing
             if interval == 'D':
@@ -319,13 +402,14 @@ class BrokerData:
                             quotes = self.get_quotes(symbol, exchange)
                             
                             if quotes:
+                                # get_quotes already returns floats and an int volume
                                 today_data = {
                                     'timestamp': today_ts,
-                                    'open': float(quotes.get('open', 0)),
-                                    'high': float(quotes.get('high', 0)),
-                                    'low': float(quotes.get('low', 0)),
-                                    'close': float(quotes.get('ltp', 0)),  # Use LTP as close
-                                    'volume': int(float(quotes.get('volume', 0))),
+                                    'open': quotes['open'],
+                                    'high': quotes['high'],
+                                    'low': quotes['low'],
+                                    'close': quotes['ltp'],  # Use LTP as close
+                                    'volume': quotes['volume'],
                                     'oi': 0  # OI not available in quotes data
                                 }
                                 logger.info(f"Today's quote data: {today_data}")
@@ -337,11 +421,12 @@ class BrokerData:
                 else:
                     logger.info(f"Today ({today_ts}) is outside requested range ({start_ts} to {end_ts})")
             
-            # Sort by timestamp
-            df = df.sort_values('timestamp')
+            # Reorder columns to match Angel format; also gives an empty frame its columns
+            df = df.reindex(columns=HISTORY_COLUMNS)
             
-            # Reorder columns to match Angel format
-            df = df[['close', 'high', 'low', 'open', 'timestamp', 'volume', 'oi']]
+            # Sort by timestamp, unless the candles are already in order
+            if not df['timestamp'].is_monotonic_increasing:
+                df = df.sort_values('timestamp')
             
             return df
             
@@ -354,4 +439,4 @@ class BrokerData:
         Returns:
             list: List of supported intervals
         """
-        return list(self.timeframe_map.keys())
+        return list(INTERVALS)
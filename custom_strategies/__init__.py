@@ -8,13 +8,14 @@ custom Python-based trading strategies with full access to OpenAlgo APIs.
 __version__ = "1.0.0"
 __author__ = "OpenAlgo Team"
 
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, AsyncBaseStrategy
 from .strategy_loader import StrategyLoader
 from .strategy_validator import StrategyValidator
 from .strategy_executor import StrategyExecutor, StrategyExecutionResult, get_strategy_executor
 
 __all__ = [
     "BaseStrategy", 
+    "AsyncBaseStrategy",
     "StrategyLoader", 
     "StrategyValidator", 
     "StrategyExecutor", 
@@ -5,15 +5,36 @@ All custom strategies must inherit from this base class and implement
 the execute() method.
 """
 
+import asyncio
+import httpx
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import threading
+import numpy as np
+from cachetools import TTLCache
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from datetime import datetime, date
+from typing import List, Dict, Any, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
 import logging
+from utils.httpx_client import HTTP2_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
+# Shared keep-alive pool for all strategy instances, sized above the scan_symbols
+# worker count; failed connects are retried briefly
+SESSION = requests.Session()
+ADAPTER = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=Retry(total=2, backoff_factor=0.1))
+SESSION.mount('http://', ADAPTER)
+SESSION.mount('https://', ADAPTER)
+SESSION.headers.update({'Content-Type': 'application/json'})
+
+# Successful history responses shared across strategy runs, keyed by account and request
+history_cache = TTLCache(maxsize=1024, ttl=300)
+history_cache_lock = threading.Lock()
+
 
 class BaseStrategy(ABC):
     """
@@ -36,6 +57,7 @@ class BaseStrategy(ABC):
         self.config = strategy_config
         self.base_url = base_url.rstrip('/')
         self.logger = logging.getLogger(f"{self.__class__.__name__}")
+        self._scratch = threading.local()
         
     def _make_api_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -55,12 +77,12 @@ class BaseStrategy(ABC):
             url = f"{self.base_url}{endpoint}"
             data['apikey'] = self.api_key
             
-            response = requests.post(url, json=data, timeout=30)
+            response = SESSION.post(url, data=orjson.dumps(data), timeout=30)
             response.raise_for_status()
             
-            return response.json()
+            return orjson.loads(response.content)
             
-        except requests.RequestException as e:
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             self.logger.error(f"API request failed for {endpoint}: {str(e)}")
             raise Exception(f"API request failed: {str(e)}")
     
@@ -94,7 +116,8 @@ class BaseStrategy(ABC):
             end_date: End date in 'YYYY-MM-DD' format
             
         Returns:
-            Historical OHLCV data
+            Historical OHLCV data; successful responses for ranges ending
+            before today are cached for five minutes
         """
         data = {
             'symbol': symbol,
@@ -103,7 +126,36 @@ class BaseStrategy(ABC):
             'start_date': start_date,
             'end_date': end_date
         }
-        return self._make_api_request('/api/v1/history', data)
+        # Today's bars are still forming, so ranges that include today are always fetched
+        cacheable = end_date < date.today().isoformat()
+        cache_key = (self.base_url, self.api_key, symbol, exchange, interval, start_date, end_date)
+        if cacheable:
+            with history_cache_lock:
+                response = history_cache.get(cache_key)
+            if response is not None:
+                return response
+        
+        response = self._make_api_request('/api/v1/history', data)
+        if cacheable and response.get('status') == 'success':
+            with history_cache_lock:
+                history_cache[cache_key] = response
+        return response
+    
+    def invalidate_history(self, symbol: Optional[str] = None):
+        """
+        Drop cached history responses for this strategy's account.
+        
+        Args:
+            symbol: Only drop entries for this symbol; all of the account's entries if None
+        """
+        account = (self.base_url, self.api_key)
+        with history_cache_lock:
+            stale = [
+                key for key in history_cache
+                if key[:2] == account and (symbol is None or key[2] == symbol)
+            ]
+            for key in stale:
+                history_cache.pop(key, None)
     
     def get_depth(self, symbol: str, exchange: str) -> Dict[str, Any]:
         """
@@ -188,6 +240,143 @@ class BaseStrategy(ABC):
         data = {}
         return self._make_api_request('/api/v1/orderbook', data)
     
+    def history_date_range(self, lookback_days: int) -> tuple:
+        """
+        Get the (start_date, end_date) strings for a daily history request.
+        
+        Args:
+            lookback_days: Number of days to look back from today
+            
+        Returns:
+            Tuple of 'YYYY-MM-DD' start and end dates
+        """
+        now = datetime.now()
+        return (now - timedelta(days=lookback_days)).strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d')
+    
+    def _fetch_batch(self, fetch: Callable[[str], Dict[str, Any]], symbols: List[str],
+                     max_workers: int = 16) -> Dict[str, Dict[str, Any]]:
+        """Call fetch(symbol) concurrently, mapping failures to error responses."""
+        if not symbols:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+            futures = {symbol: executor.submit(fetch, symbol) for symbol in symbols}
+        
+        results = {}
+        for symbol, future in futures.items():
+            try:
+                results[symbol] = future.result()
+            except Exception as e:
+                results[symbol] = {'status': 'error', 'message': str(e)}
+        return results
+    
+    def get_history_batch(self, symbols: List[str], exchange: str, interval: str,
+                          start_date: str, end_date: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get historical data for many symbols at once.
+        
+        Args:
+            symbols: Trading symbols
+            exchange: Exchange code
+            interval: Time interval ('1m', '5m', '15m', '30m', '1h', '1d')
+            start_date: Start date in 'YYYY-MM-DD' format
+            end_date: End date in 'YYYY-MM-DD' format
+            
+        Returns:
+            History response per symbol; failed requests map to an error response
+        """
+        return self._fetch_batch(
+            lambda symbol: self.get_history(symbol, exchange, interval, start_date, end_date), symbols
+        )
+    
+    def get_quotes_batch(self, symbols: List[str], exchange: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get real-time quotes for many symbols at once.
+        
+        Args:
+            symbols: Trading symbols
+            exchange: Exchange code
+            
+        Returns:
+            Quote response per symbol; failed requests map to an error response
+        """
+        return self._fetch_batch(lambda symbol: self.get_quotes(symbol, exchange), symbols)
+    
+    def confirm_quote(self, symbol: str, exchange: str) -> bool:
+        """
+        Confirm a signal against the live quote.
+        
+        Called only once a local signal has fired, so symbols without a
+        signal cost no quote request.
+        
+        Args:
+            symbol: Trading symbol
+            exchange: Exchange code
+            
+        Returns:
+            True if a quote was received for the symbol
+        """
+        quote_response = self.get_quotes(symbol, exchange)
+        if quote_response.get('status') == 'success':
+            ltp = quote_response.get('data', {}).get('ltp', 0)
+            self.log_info(f"Current LTP for {symbol}: {ltp}")
+            return True
+        self.log_warning(f"Could not get current quote for {symbol}")
+        return False
+    
+    def scan_symbols(self, analyze: Callable[[str], bool], symbols: List[str], max_workers: int = 16) -> List[str]:
+        """
+        Run a per-symbol analysis concurrently.
+        
+        Analyses are dominated by blocking API calls, so running them on a
+        thread pool overlaps the network waits.
+        
+        Args:
+            analyze: Function returning True if the symbol has a signal
+            symbols: Symbols to analyze
+            max_workers: Maximum number of concurrent analyses
+            
+        Returns:
+            Symbols with a signal, in the order they were given
+        """
+        if not symbols:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+            futures = [executor.submit(analyze, symbol) for symbol in symbols]
+        
+        signals = []
+        for symbol, future in zip(symbols, futures):
+            try:
+                if future.result():
+                    signals.append(symbol)
+                    self.log_info(f"Added {symbol} to signal list")
+            except Exception as e:
+                self.log_error(f"Error processing {symbol}: {str(e)}")
+        
+        return signals
+    
+    def scratch_array(self, name: str, size: int) -> np.ndarray:
+        """
+        Get a reusable float64 work array for per-symbol calculations.
+        
+        Buffers are kept per thread so concurrent scan_symbols analyses never
+        share one. The returned view is overwritten by the next call with the
+        same name on the same thread.
+        
+        Args:
+            name: Buffer name, e.g. 'close'
+            size: Number of elements needed
+            
+        Returns:
+            View of length size into the thread's buffer
+        """
+        buffers = self._scratch.__dict__
+        buffer = buffers.get(name)
+        if buffer is None or buffer.size < size:
+            buffer = buffers[name] = np.empty(max(size, 256))
+        return buffer[:size]
+    
     def log_info(self, message: str):
         """Log info message."""
         self.logger.info(message)
@@ -245,4 +434,120 @@ class BaseStrategy(ABC):
             if isinstance(symbol, str) and symbol.strip():
                 valid_symbols.append(symbol.strip().upper())
         
-        return valid_symbols
\ No newline at end of file
+        return valid_symbols
+
+
+class AsyncBaseStrategy(BaseStrategy):
+    """
+    Base class for custom strategies that fan out API calls concurrently.
+    
+    Subclasses implement execute_async() instead of execute() and can await
+    the *_async data methods, e.g. get_quotes_many() for a whole watchlist.
+    The sync BaseStrategy methods remain available.
+    """
+    
+    # Maximum number of API requests in flight per strategy run
+    max_concurrency = 16
+    
+    def __init__(self, api_key: str, strategy_config: Dict[str, Any], base_url: str = "http://127.0.0.1:5000"):
+        super().__init__(api_key, strategy_config, base_url)
+        self.client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    def execute(self) -> List[str]:
+        """Run execute_async() on a fresh event loop with its own HTTP client."""
+        return asyncio.run(self._run())
+    
+    async def _run(self) -> List[str]:
+        # AsyncClient connections are bound to the loop that created them
+        limits = httpx.Limits(max_keepalive_connections=20, max_connections=self.max_concurrency)
+        async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=limits, timeout=30.0) as client:
+            self.client = client
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            try:
+                return await self.execute_async()
+            finally:
+                self.client = None
+    
+    async def _make_api_request_async(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Make a request to OpenAlgo API without blocking the event loop.
+        
+        Args:
+            endpoint: API endpoint (e.g., '/api/v1/quotes')
+            data: Request payload
+            
+        Returns:
+            API response as dictionary
+            
+        Raises:
+            Exception: If API request fails
+        """
+        try:
+            url = f"{self.base_url}{endpoint}"
+            data['apikey'] = self.api_key
+            
+            async with self._semaphore:
+                response = await self.client.post(
+                    url, content=orjson.dumps(data), headers={'Content-Type': 'application/json'}
+                )
+            response.raise_for_status()
+            
+            return orjson.loads(response.content)
+            
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            self.logger.error(f"API request failed for {endpoint}: {str(e)}")
+            raise Exception(f"API request failed: {str(e)}")
+    
+    async def get_quotes_async(self, symbol: str, exchange: str) -> Dict[str, Any]:
+        """Async variant of get_quotes()."""
+        data = {
+            'symbol': symbol,
+            'exchange': exchange
+        }
+        return await self._make_api_request_async('/api/v1/quotes', data)
+    
+    async def get_depth_async(self, symbol: str, exchange: str) -> Dict[str, Any]:
+        """Async variant of get_depth()."""
+        data = {
+            'symbol': symbol,
+            'exchange': exchange
+        }
+        return await self._make_api_request_async('/api/v1/depth', data)
+    
+    async def get_history_async(self, symbol: str, exchange: str, interval: str,
+                                start_date: str, end_date: str) -> Dict[str, Any]:
+        """Async variant of get_history()."""
+        data = {
+            'symbol': symbol,
+            'exchange': exchange,
+            'interval': interval,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+        return await self._make_api_request_async('/api/v1/history', data)
+    
+    async def get_quotes_many(self, pairs: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Get quotes for many symbols concurrently.
+        
+        Args:
+            pairs: List of (symbol, exchange) tuples
+            
+        Returns:
+            Quote responses in the same order as pairs
+        """
+        return await asyncio.gather(*[self.get_quotes_async(symbol, exchange) for symbol, exchange in pairs])
+    
+    @abstractmethod
+    async def execute_async(self) -> List[str]:
+        """
+        Execute the strategy logic.
+        
+        Async counterpart of BaseStrategy.execute() that must be implemented
+        by strategies built on this class.
+        
+        Returns:
+            List of symbols to trade based on strategy signals
+        """
+        pass
@@ -0,0 +1,64 @@
+"""
+EMA kernels used by the EMA crossover example strategy.
+
+The kernels are JIT-compiled with Numba on first use when it is available.
+To skip that warmup on the first strategy run, compile them ahead of time
+into the ema_kernels_aot extension module next to this file:
+
+    python -m custom_strategies.ema_kernels
+"""
+
+import os
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _ema(prices, alpha):
+    """EMA recurrence seeded with the first price, same as pandas ewm(adjust=False)"""
+    out = np.empty(prices.size)
+    out[0] = prices[0]
+    for i in range(1, prices.size):
+        out[i] = alpha * prices[i] + (1 - alpha) * out[i - 1]
+    return out
+
+
+def _dual_ema_tail(prices, alpha_short, alpha_long):
+    """Run both EMAs in one pass, returning (prev_short, prev_long, short, long)"""
+    short = prices[0]
+    long = prices[0]
+    prev_short = short
+    prev_long = long
+    for i in range(1, prices.size):
+        prev_short = short
+        prev_long = long
+        short = alpha_short * prices[i] + (1 - alpha_short) * short
+        long = alpha_long * prices[i] + (1 - alpha_long) * long
+    return prev_short, prev_long, short, long
+
+
+if NUMBA_AVAILABLE:
+    ema = njit(cache=True, fastmath=True)(_ema)
+    dual_ema_tail = njit(cache=True, fastmath=True)(_dual_ema_tail)
+else:
+    ema = _ema
+    dual_ema_tail = _dual_ema_tail
+
+
+def build_aot():
+    """Compile the kernels into the ema_kernels_aot extension module"""
+    from numba.pycc import CC
+
+    cc = CC('ema_kernels_aot')
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export('ema', 'f8[:](f8[:], f8)')(_ema)
+    cc.export('dual_ema_tail', 'UniTuple(f8, 4)(f8[:], f8, f8)')(_dual_ema_tail)
+    cc.compile()
+
+
+if __name__ == '__main__':
+    build_aot()
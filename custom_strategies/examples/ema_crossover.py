@@ -6,9 +6,14 @@ when the short EMA crosses above the long EMA.
 """
 
 from custom_strategies.base_strategy import BaseStrategy
-import pandas as pd
+import numpy as np
 from typing import List
-from datetime import datetime, timedelta
+
+try:
+    # Ahead-of-time build, see custom_strategies/ema_kernels.py
+    from custom_strategies.ema_kernels_aot import ema, dual_ema_tail
+except ImportError:
+    from custom_strategies.ema_kernels import ema, dual_ema_tail
 
 
 class EMACrossoverStrategy(BaseStrategy):
@@ -26,6 +31,9 @@ class EMACrossoverStrategy(BaseStrategy):
         # Strategy parameters
         self.short_period = self.get_config_value('short_period', 9)
         self.long_period = self.get_config_value('long_period', 21)
+        # EMA smoothing factors, fixed for the life of the strategy
+        self.short_alpha = 2.0 / (self.short_period + 1)
+        self.long_alpha = 2.0 / (self.long_period + 1)
         self.symbols = self.get_config_value('symbols', ['RELIANCE', 'TCS', 'INFY', 'HDFC', 'ICICIBANK'])
         self.exchange = self.get_config_value('exchange', 'NSE')
         self.lookback_days = self.get_config_value('lookback_days', 30)
@@ -46,9 +54,7 @@ class EMACrossoverStrategy(BaseStrategy):
         if len(prices) < period:
             return []
         
-        df = pd.DataFrame({'price': prices})
-        ema = df['price'].ewm(span=period, adjust=False).mean()
-        return ema.tolist()
+        return ema(np.asarray(prices, dtype=np.float64), 2.0 / (period + 1)).tolist()
     
     def check_crossover(self, short_ema: List[float], long_ema: List[float]) -> bool:
         """
@@ -64,36 +70,21 @@ class EMACrossoverStrategy(BaseStrategy):
         if len(short_ema) < 2 or len(long_ema) < 2:
             return False
         
-        # Check if short EMA crossed above long EMA in the last period
-        current_short = short_ema[-1]
-        current_long = long_ema[-1]
-        previous_short = short_ema[-2]
-        previous_long = long_ema[-2]
-        
         # Crossover: previous short <= previous long AND current short > current long
-        crossover = (previous_short <= previous_long) and (current_short > current_long)
-        
-        return crossover
+        return (short_ema[-2] - long_ema[-2]) <= 0.0 < (short_ema[-1] - long_ema[-1])
     
-    def analyze_symbol(self, symbol: str) -> bool:
+    def analyze_symbol(self, symbol: str, history_response: dict) -> bool:
         """
         Analyze a single symbol for EMA crossover.
         
         Args:
             symbol: Symbol to analyze
+            history_response: Daily history response for the symbol
             
         Returns:
             True if crossover signal detected, False otherwise
         """
         try:
-            # Calculate date range
-            end_date = datetime.now().strftime('%Y-%m-%d')
-            start_date = (datetime.now() - timedelta(days=self.lookback_days)).strftime('%Y-%m-%d')
-            
-            # Get historical data
-            self.log_info(f"Fetching historical data for {symbol}")
-            history_response = self.get_history(symbol, self.exchange, '1d', start_date, end_date)
-            
             if history_response.get('status') != 'success':
                 self.log_warning(f"Failed to get history for {symbol}: {history_response.get('message', 'Unknown error')}")
                 return False
@@ -104,31 +95,20 @@ class EMACrossoverStrategy(BaseStrategy):
                 return False
             
             # Extract closing prices
-            closes = [float(bar['close']) for bar in history_data]
-            
-            # Calculate EMAs
-            short_ema = self.calculate_ema(closes, self.short_period)
-            long_ema = self.calculate_ema(closes, self.long_period)
+            closes = np.fromiter((float(bar['close']) for bar in history_data),
+                                 dtype=np.float64, count=len(history_data))
             
-            if not short_ema or not long_ema:
-                self.log_warning(f"Could not calculate EMAs for {symbol}")
-                return False
+            # Only the last two values of each EMA are needed for the crossover check
+            prev_short, prev_long, short_ema, long_ema = dual_ema_tail(closes, self.short_alpha, self.long_alpha)
             
-            # Check for crossover
-            crossover = self.check_crossover(short_ema, long_ema)
+            # Crossover: short EMA was at or below the long EMA and is now above it
+            crossover = (prev_short - prev_long) <= 0.0 < (short_ema - long_ema)
             
             if crossover:
-                self.log_info(f"EMA Crossover detected for {symbol} - Short EMA: {short_ema[-1]:.2f}, Long EMA: {long_ema[-1]:.2f}")
+                self.log_info(f"EMA Crossover detected for {symbol} - Short EMA: {short_ema:.2f}, Long EMA: {long_ema:.2f}")
                 
                 # Additional validation: get current quote to ensure market is active
-                quote_response = self.get_quotes(symbol, self.exchange)
-                if quote_response.get('status') == 'success':
-                    ltp = quote_response.get('data', {}).get('ltp', 0)
-                    self.log_info(f"Current LTP for {symbol}: {ltp}")
-                    return True
-                else:
-                    self.log_warning(f"Could not get current quote for {symbol}")
-                    return False
+                return self.confirm_quote(symbol, self.exchange)
             
             return False
             
@@ -145,17 +125,14 @@ class EMACrossoverStrategy(BaseStrategy):
         """
         self.log_info("Executing EMA Crossover Strategy")
         
-        signals = []
+        # Fetch daily history for every symbol up front
+        start_date, end_date = self.history_date_range(self.lookback_days)
+        self.log_info(f"Fetching historical data for {len(self.symbols)} symbols")
+        histories = self.get_history_batch(self.symbols, self.exchange, '1d', start_date, end_date)
         
-        for symbol in self.symbols:
-            try:
-                if self.analyze_symbol(symbol):
-                    signals.append(symbol)
-                    self.log_info(f"Added {symbol} to signal list")
-                
-            except Exception as e:
-                self.log_error(f"Error processing {symbol}: {str(e)}")
-                continue
+        signals = self.scan_symbols(
+            lambda symbol: self.analyze_symbol(symbol, histories[symbol]), self.symbols
+        )
         
         self.log_info(f"Strategy execution completed. Signals generated for: {signals}")
         
@@ -6,9 +6,8 @@ to bounce back toward their average price levels.
 """
 
 from custom_strategies.base_strategy import BaseStrategy
-import pandas as pd
+import numpy as np
 from typing import List
-from datetime import datetime, timedelta
 
 
 class MeanReversionStrategy(BaseStrategy):
@@ -34,62 +33,112 @@ class MeanReversionStrategy(BaseStrategy):
         
         self.log_info(f"Mean Reversion Strategy initialized - MA Period: {self.ma_period}, Entry: {self.entry_threshold}σ")
     
-    def calculate_bollinger_metrics(self, data: List[dict]) -> dict:
+    def load_closes(self, data: List[dict]) -> np.ndarray:
         """
-        Calculate Bollinger Band and mean reversion metrics.
+        Read closing prices into the reusable close buffer.
         
         Args:
             data: List of OHLCV data dictionaries
             
         Returns:
-            Dictionary with mean reversion metrics
+            Closing prices, oldest first
         """
-        if len(data) < self.ma_period + 5:
-            return {}
-        
-        df = pd.DataFrame(data)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
+        closes = self.scratch_array('close', len(data))
+        for i, bar in enumerate(data):
+            closes[i] = float(bar['close'])
+        return closes
+    
+    def calculate_z_fast(self, closes: np.ndarray) -> dict:
+        """
+        Calculate the z-score of the latest close against its moving average.
         
-        # Calculate moving average and standard deviation
-        df['ma'] = df['close'].rolling(window=self.ma_period).mean()
-        df['std'] = df['close'].rolling(window=self.std_period).std()
+        Args:
+            closes: Closing prices, oldest first
+            
+        Returns:
+            Dictionary with current price, moving average, std dev and z-score
+        """
+        # Only the latest moving average and standard deviation are used
+        current_price = float(closes[-1])
+        current_ma = float(closes[-self.ma_period:].mean())
+        std_window = closes[-self.std_period:]
+        current_std = float(std_window.std(ddof=1)) if std_window.size == self.std_period else 0.0
         
-        # Calculate Bollinger Bands
-        df['upper_band'] = df['ma'] + (2 * df['std'])
-        df['lower_band'] = df['ma'] - (2 * df['std'])
+        # Position relative to the bands (z-score)
+        current_z_score = (current_price - current_ma) / current_std if current_std > 0 else 0.0
         
-        # Calculate position relative to bands (z-score)
-        df['z_score'] = (df['close'] - df['ma']) / df['std']
+        return {
+            'current_price': current_price,
+            'moving_average': current_ma,
+            'std_dev': current_std,
+            'z_score': current_z_score
+        }
+    
+    def calculate_supporting_metrics(self, data: List[dict], closes: np.ndarray, metrics: dict) -> dict:
+        """
+        Calculate band, volume and support metrics around a z-score result.
         
-        # Get current values
-        current_price = df['close'].iloc[-1]
-        current_ma = df['ma'].iloc[-1]
-        current_std = df['std'].iloc[-1]
-        current_z_score = df['z_score'].iloc[-1]
-        current_volume = df['volume'].iloc[-1]
+        Args:
+            data: List of OHLCV data dictionaries
+            closes: Closing prices, oldest first
+            metrics: Result of calculate_z_fast()
+            
+        Returns:
+            Dictionary with the remaining mean reversion metrics
+        """
+        tail = data[-10:]
+        volumes = self.scratch_array('volume', len(tail))
+        for i, bar in enumerate(tail):
+            volumes[i] = float(bar['volume'])
+        current_price = metrics['current_price']
+        current_ma = metrics['moving_average']
+        current_std = metrics['std_dev']
         
         # Volume metrics
-        avg_volume = df['volume'].iloc[-10:].mean()  # 10-day average
-        volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
-        
-        # Support/resistance levels
-        recent_low = df['close'].iloc[-10:].min()
-        recent_high = df['close'].iloc[-10:].max()
+        avg_volume = volumes.mean()  # 10-day average
+        volume_ratio = float(volumes[-1] / avg_volume) if avg_volume > 0 else 0
         
         return {
-            'current_price': current_price,
-            'moving_average': current_ma,
-            'std_dev': current_std,
-            'z_score': current_z_score,
             'upper_band': current_ma + (2 * current_std),
             'lower_band': current_ma - (2 * current_std),
             'volume_ratio': volume_ratio,
-            'recent_low': recent_low,
-            'recent_high': recent_high,
+            # Support/resistance levels
+            'recent_low': float(closes[-10:].min()),
+            'recent_high': float(closes[-10:].max()),
             'price_vs_ma': ((current_price - current_ma) / current_ma) * 100
         }
     
+    def calculate_bollinger_metrics(self, data: List[dict]) -> dict:
+        """
+        Calculate Bollinger Band and mean reversion metrics.
+        
+        Args:
+            data: List of OHLCV data dictionaries
+            
+        Returns:
+            Dictionary with mean reversion metrics
+        """
+        if len(data) < self.ma_period + 5:
+            return {}
+        
+        closes = self.load_closes(data)
+        metrics = self.calculate_z_fast(closes)
+        metrics.update(self.calculate_supporting_metrics(data, closes, metrics))
+        return metrics
+    
+    def passes_z_gate(self, metrics: dict) -> bool:
+        """
+        Check the z-score filters, which reject most symbols.
+        
+        Args:
+            metrics: Dictionary with at least z_score and std_dev
+            
+        Returns:
+            True if oversold but not extreme with a valid standard deviation
+        """
+        z_score = metrics['z_score']
+        return self.max_deviation <= z_score <= self.entry_threshold and metrics['std_dev'] > 0
+    
     def check_mean_reversion_signal(self, metrics: dict) -> bool:
         """
         Check if mean reversion criteria are met.
@@ -100,60 +149,32 @@ class MeanReversionStrategy(BaseStrategy):
         Returns:
             True if mean reversion signal detected, False otherwise
         """
-        if not metrics:
+        # Oversold, not too oversold (avoid falling knives), valid standard deviation
+        if not metrics or not self.passes_z_gate(metrics):
             return False
         
-        z_score = metrics['z_score']
-        volume_ratio = metrics['volume_ratio']
         current_price = metrics['current_price']
         recent_low = metrics['recent_low']
         
-        # Check for oversold condition
-        oversold = z_score <= self.entry_threshold
-        
-        # Not too oversold (avoid falling knives)
-        not_extreme = z_score >= self.max_deviation
-        
         # Volume confirmation if required
-        volume_ok = True
-        if self.volume_confirm:
-            volume_ok = volume_ratio >= 1.2  # Above average volume
-        
-        # Price near recent support
-        near_support = current_price <= recent_low * 1.02  # Within 2% of recent low
-        
-        # Additional quality filters
-        has_std = metrics['std_dev'] > 0  # Valid standard deviation
-        not_gap_down = current_price >= metrics['recent_low'] * 0.95  # Not a major gap down
-        
-        signal = (oversold and 
-                 not_extreme and 
-                 volume_ok and 
-                 near_support and 
-                 has_std and 
-                 not_gap_down)
+        if self.volume_confirm and metrics['volume_ratio'] < 1.2:  # Above average volume
+            return False
         
-        return signal
+        # Price near recent support, but not a major gap down
+        return recent_low * 0.95 <= current_price <= recent_low * 1.02
     
-    def analyze_symbol(self, symbol: str) -> bool:
+    def analyze_symbol(self, symbol: str, history_response: dict) -> bool:
         """
         Analyze a single symbol for mean reversion signals.
         
         Args:
             symbol: Symbol to analyze
+            history_response: Daily history response for the symbol
             
         Returns:
             True if mean reversion signal detected, False otherwise
         """
         try:
-            # Calculate date range
-            end_date = datetime.now().strftime('%Y-%m-%d')
-            start_date = (datetime.now() - timedelta(days=self.lookback_days)).strftime('%Y-%m-%d')
-            
-            # Get historical data
-            self.log_info(f"Fetching historical data for {symbol}")
-            history_response = self.get_history(symbol, self.exchange, '1d', start_date, end_date)
-            
             if history_response.get('status') != 'success':
                 self.log_warning(f"Failed to get history for {symbol}: {history_response.get('message', 'Unknown error')}")
                 return False
@@ -163,13 +184,21 @@ class MeanReversionStrategy(BaseStrategy):
                 self.log_warning(f"Insufficient data for {symbol}: {len(history_data)} bars")
                 return False
             
-            # Calculate mean reversion metrics
-            metrics = self.calculate_bollinger_metrics(history_data)
+            # Calculate the z-score first; most symbols are rejected by it alone
+            closes = self.load_closes(history_data)
+            metrics = self.calculate_z_fast(closes)
             
-            if not metrics:
-                self.log_warning(f"Could not calculate mean reversion metrics for {symbol}")
+            if not self.passes_z_gate(metrics):
+                # Log why signal was not generated
+                z_score = metrics['z_score']
+                if z_score > self.entry_threshold:
+                    self.log_info(f"{symbol}: Not oversold enough (Z-Score: {z_score:.2f})")
+                elif z_score < self.max_deviation:
+                    self.log_info(f"{symbol}: Too oversold, possible falling knife (Z-Score: {z_score:.2f})")
                 return False
             
+            metrics.update(self.calculate_supporting_metrics(history_data, closes, metrics))
+            
             # Check for mean reversion signal
             signal = self.check_mean_reversion_signal(metrics)
             
@@ -182,23 +211,9 @@ class MeanReversionStrategy(BaseStrategy):
                 self.log_info(f"  Moving average: {metrics['moving_average']:.2f}")
                 
                 # Additional validation: get current quote
-                quote_response = self.get_quotes(symbol, self.exchange)
-                if quote_response.get('status') == 'success':
-                    ltp = quote_response.get('data', {}).get('ltp', 0)
-                    self.log_info(f"Current LTP for {symbol}: {ltp}")
-                    return True
-                else:
-                    self.log_warning(f"Could not get current quote for {symbol}")
-                    return False
-            else:
-                # Log why signal was not generated
-                z_score = metrics.get('z_score', 0)
-                if z_score > self.entry_threshold:
-                    self.log_info(f"{symbol}: Not oversold enough (Z-Score: {z_score:.2f})")
-                elif z_score < self.max_deviation:
-                    self.log_info(f"{symbol}: Too oversold, possible falling knife (Z-Score: {z_score:.2f})")
-                elif self.volume_confirm and metrics.get('volume_ratio', 0) < 1.2:
-                    self.log_info(f"{symbol}: Insufficient volume confirmation ({metrics.get('volume_ratio', 0):.2f}x)")
+                return self.confirm_quote(symbol, self.exchange)
+            elif self.volume_confirm and metrics['volume_ratio'] < 1.2:
+                self.log_info(f"{symbol}: Insufficient volume confirmation ({metrics['volume_ratio']:.2f}x)")
             
             return False
             
@@ -215,17 +230,14 @@ class MeanReversionStrategy(BaseStrategy):
         """
         self.log_info("Executing Mean Reversion Strategy")
         
-        signals = []
+        # Fetch daily history for every symbol up front
+        start_date, end_date = self.history_date_range(self.lookback_days)
+        self.log_info(f"Fetching historical data for {len(self.symbols)} symbols")
+        histories = self.get_history_batch(self.symbols, self.exchange, '1d', start_date, end_date)
         
-        for symbol in self.symbols:
-            try:
-                if self.analyze_symbol(symbol):
-                    signals.append(symbol)
-                    self.log_info(f"Added {symbol} to signal list")
-                
-            except Exception as e:
-                self.log_error(f"Error processing {symbol}: {str(e)}")
-                continue
+        signals = self.scan_symbols(
+            lambda symbol: self.analyze_symbol(symbol, histories[symbol]), self.symbols
+        )
         
         self.log_info(f"Strategy execution completed. Signals generated for: {signals}")
         
@@ -6,9 +6,53 @@ and volume confirmation for potential continuation moves.
 """
 
 from custom_strategies.base_strategy import BaseStrategy
-import pandas as pd
+import numpy as np
 from typing import List
-from datetime import datetime, timedelta
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _momentum_core(closes, volumes, highs, period):
+    """Return (price_change, volume_ratio, price_vs_high, recent_high, volatility, avg_volume)"""
+    n = closes.size
+    current_price = closes[n - 1]
+    period_start_price = closes[n - period - 1]
+    
+    # Price momentum
+    price_change = ((current_price - period_start_price) / period_start_price) * 100
+    
+    # Volume metrics
+    recent_volume = volumes[n - 1]
+    avg_volume = volumes[max(n - 20, 0):].mean()  # 20-day average volume
+    volume_ratio = recent_volume / avg_volume if avg_volume > 0 else 0.0
+    
+    # Price position relative to recent high
+    recent_high = highs[n - period:].max()
+    price_vs_high = current_price / recent_high if recent_high > 0 else 0.0
+    
+    # Volatility check (sample standard deviation of returns, in one pass for the mean)
+    returns = np.empty(n - 1)
+    total = 0.0
+    for i in range(n - 1):
+        returns[i] = (closes[i + 1] - closes[i]) / closes[i]
+        total += returns[i]
+    mean = total / (n - 1)
+    var = 0.0
+    for i in range(n - 1):
+        var += (returns[i] - mean) ** 2
+    volatility = np.sqrt(var / (n - 2)) * 100.0  # As percentage
+    
+    return price_change, volume_ratio, price_vs_high, recent_high, volatility, avg_volume
+
+
+if NUMBA_AVAILABLE:
+    momentum_core = njit(cache=True, fastmath=True)(_momentum_core)
+else:
+    momentum_core = _momentum_core
 
 
 class MomentumStrategy(BaseStrategy):
@@ -48,31 +92,21 @@ class MomentumStrategy(BaseStrategy):
         if len(data) < self.momentum_period + 10:
             return {}
         
-        df = pd.DataFrame(data)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        
-        # Calculate metrics
-        current_price = df['close'].iloc[-1]
-        period_start_price = df['close'].iloc[-(self.momentum_period + 1)]
-        
-        # Price momentum
-        price_change = ((current_price - period_start_price) / period_start_price) * 100
-        
-        # Volume metrics
-        recent_volume = df['volume'].iloc[-1]
-        avg_volume = df['volume'].iloc[-20:].mean()  # 20-day average volume
-        volume_ratio = recent_volume / avg_volume if avg_volume > 0 else 0
-        
-        # Price position relative to recent high
-        recent_high = df['high'].iloc[-self.momentum_period:].max()
-        price_vs_high = current_price / recent_high if recent_high > 0 else 0
-        
-        # Volatility check (standard deviation of returns)
-        returns = df['close'].pct_change().dropna()
-        volatility = returns.std() * 100  # As percentage
+        # Read the needed columns in a single pass into reusable buffers
+        n = len(data)
+        closes = self.scratch_array('close', n)
+        volumes = self.scratch_array('volume', n)
+        highs = self.scratch_array('high', n)
+        for i, bar in enumerate(data):
+            closes[i] = float(bar['close'])
+            volumes[i] = float(bar['volume'])
+            highs[i] = float(bar['high'])
+        
+        price_change, volume_ratio, price_vs_high, recent_high, volatility, avg_volume = momentum_core(
+            closes, volumes, highs, self.momentum_period
+        )
+        current_price = float(closes[-1])
+        recent_volume = float(volumes[-1])
         
         return {
             'current_price': current_price,
@@ -115,25 +149,18 @@ class MomentumStrategy(BaseStrategy):
         
         return signal
     
-    def analyze_symbol(self, symbol: str) -> bool:
+    def analyze_symbol(self, symbol: str, history_response: dict) -> bool:
         """
         Analyze a single symbol for momentum signals.
         
         Args:
             symbol: Symbol to analyze
+            history_response: Daily history response for the symbol
             
         Returns:
             True if momentum signal detected, False otherwise
         """
         try:
-            # Calculate date range
-            end_date = datetime.now().strftime('%Y-%m-%d')
-            start_date = (datetime.now() - timedelta(days=self.lookback_days)).strftime('%Y-%m-%d')
-            
-            # Get historical data
-            self.log_info(f"Fetching historical data for {symbol}")
-            history_response = self.get_history(symbol, self.exchange, '1d', start_date, end_date)
-            
             if history_response.get('status') != 'success':
                 self.log_warning(f"Failed to get history for {symbol}: {history_response.get('message', 'Unknown error')}")
                 return False
@@ -161,14 +188,7 @@ class MomentumStrategy(BaseStrategy):
                 self.log_info(f"  Volatility: {metrics['volatility']:.2f}%")
                 
                 # Additional validation: get current quote
-                quote_response = self.get_quotes(symbol, self.exchange)
-                if quote_response.get('status') == 'success':
-                    ltp = quote_response.get('data', {}).get('ltp', 0)
-                    self.log_info(f"Current LTP for {symbol}: {ltp}")
-                    return True
-                else:
-                    self.log_warning(f"Could not get current quote for {symbol}")
-                    return False
+                return self.confirm_quote(symbol, self.exchange)
             else:
                 # Log why signal was not generated
                 if metrics['price_change'] < self.min_price_change:
@@ -193,17 +213,14 @@ class MomentumStrategy(BaseStrategy):
         """
         self.log_info("Executing Momentum Strategy")
         
-        signals = []
+        # Fetch daily history for every symbol up front
+        start_date, end_date = self.history_date_range(self.lookback_days)
+        self.log_info(f"Fetching historical data for {len(self.symbols)} symbols")
+        histories = self.get_history_batch(self.symbols, self.exchange, '1d', start_date, end_date)
         
-        for symbol in self.symbols:
-            try:
-                if self.analyze_symbol(symbol):
-                    signals.append(symbol)
-                    self.log_info(f"Added {symbol} to signal list")
-                
-            except Exception as e:
-                self.log_error(f"Error processing {symbol}: {str(e)}")
-                continue
+        signals = self.scan_symbols(
+            lambda symbol: self.analyze_symbol(symbol, histories[symbol]), self.symbols
+        )
         
         self.log_info(f"Strategy execution completed. Signals generated for: {signals}")
         
@@ -8,7 +8,6 @@ Generates buy signals when RSI is oversold and shows signs of reversal.
 from custom_strategies.base_strategy import BaseStrategy
 import pandas as pd
 from typing import List
-from datetime import datetime, timedelta
 
 
 class RSIStrategy(BaseStrategy):
@@ -88,25 +87,18 @@ class RSIStrategy(BaseStrategy):
         
         return signal
     
-    def analyze_symbol(self, symbol: str) -> bool:
+    def analyze_symbol(self, symbol: str, history_response: dict) -> bool:
         """
         Analyze a single symbol for RSI signals.
         
         Args:
             symbol: Symbol to analyze
+            history_response: Daily history response for the symbol
             
         Returns:
             True if RSI signal detected, False otherwise
         """
         try:
-            # Calculate date range
-            end_date = datetime.now().strftime('%Y-%m-%d')
-            start_date = (datetime.now() - timedelta(days=self.lookback_days)).strftime('%Y-%m-%d')
-            
-            # Get historical data
-            self.log_info(f"Fetching historical data for {symbol}")
-            history_response = self.get_history(symbol, self.exchange, '1d', start_date, end_date)
-            
             if history_response.get('status') != 'success':
                 self.log_warning(f"Failed to get history for {symbol}: {history_response.get('message', 'Unknown error')}")
                 return False
@@ -134,14 +126,7 @@ class RSIStrategy(BaseStrategy):
                 self.log_info(f"RSI Signal detected for {symbol} - Current RSI: {current_rsi:.2f}")
                 
                 # Additional validation: get current quote
-                quote_response = self.get_quotes(symbol, self.exchange)
-                if quote_response.get('status') == 'success':
-                    ltp = quote_response.get('data', {}).get('ltp', 0)
-                    self.log_info(f"Current LTP for {symbol}: {ltp}")
-                    return True
-                else:
-                    self.log_warning(f"Could not get current quote for {symbol}")
-                    return False
+                return self.confirm_quote(symbol, self.exchange)
             
             return False
             
@@ -158,17 +143,14 @@ class RSIStrategy(BaseStrategy):
         """
         self.log_info("Executing RSI Strategy")
         
-        signals = []
+        # Fetch daily history for every symbol up front
+        start_date, end_date = self.history_date_range(self.lookback_days)
+        self.log_info(f"Fetching historical data for {len(self.symbols)} symbols")
+        histories = self.get_history_batch(self.symbols, self.exchange, '1d', start_date, end_date)
         
-        for symbol in self.symbols:
-            try:
-                if self.analyze_symbol(symbol):
-                    signals.append(symbol)
-                    self.log_info(f"Added {symbol} to signal list")
-                
-            except Exception as e:
-                self.log_error(f"Error processing {symbol}: {str(e)}")
-                continue
+        signals = self.scan_symbols(
+            lambda symbol: self.analyze_symbol(symbol, histories[symbol]), self.symbols
+        )
         
         self.log_info(f"Strategy execution completed. Signals generated for: {signals}")
         
@@ -5,6 +5,7 @@ Strategy Loader - Dynamically loads and manages custom strategies
 import os
 import importlib.util
 import inspect
+import threading
 from typing import Dict, List, Optional, Type
 import logging
 from .base_strategy import BaseStrategy
@@ -27,6 +28,8 @@ class StrategyLoader:
         self.strategies_path = strategies_path
         self.loaded_strategies: Dict[str, Type[BaseStrategy]] = {}
         self._strategy_cache: Dict[str, Dict] = {}
+        self._strategy_list_cache = None  # (snapshot, strategies)
+        self._strategy_list_lock = threading.Lock()
     
     def discover_strategies(self) -> List[Dict[str, str]]:
         """
@@ -234,16 +237,46 @@ class StrategyLoader:
         # Reload
         return self.load_strategy(strategy_name, category)
     
+    def _directory_snapshot(self) -> tuple:
+        """
+        Capture modification times of the strategy directories and files.
+        
+        Returns:
+            Tuple that changes whenever a strategy file is added, removed or edited
+        """
+        snapshot = []
+        for category in ("examples", "user_strategies"):
+            directory = os.path.join(self.strategies_path, category)
+            try:
+                with os.scandir(directory) as entries:
+                    files = tuple(sorted(
+                        (entry.name, entry.stat().st_mtime_ns)
+                        for entry in entries
+                        if entry.name.endswith('.py') and not entry.name.startswith('__')
+                    ))
+                snapshot.append((category, os.stat(directory).st_mtime_ns, files))
+            except OSError:
+                snapshot.append((category, None, ()))
+        return tuple(snapshot)
+    
     def get_strategy_list(self) -> List[Dict[str, str]]:
         """
         Get a formatted list of all available strategies.
         
+        The scan is cached until a strategy file or directory changes.
+        
         Returns:
             List of strategy information for UI display
         """
-        strategies = self.discover_strategies()
-        
-        # Sort by category and name
-        strategies.sort(key=lambda x: (x['category'], x['name']))
-        
-        return strategies
\ No newline at end of file
+        with self._strategy_list_lock:
+            snapshot = self._directory_snapshot()
+            if self._strategy_list_cache and self._strategy_list_cache[0] == snapshot:
+                return [dict(strategy) for strategy in self._strategy_list_cache[1]]
+            
+            strategies = self.discover_strategies()
+            
+            # Sort by category and name
+            strategies.sort(key=lambda x: (x['category'], x['name']))
+            
+            self._strategy_list_cache = (snapshot, strategies)
+            return [dict(strategy) for strategy in strategies]
\ No newline at end of file
@@ -9,6 +9,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Strategy base classes and the entry point each requires subclasses to implement
+BASE_CLASSES = {'BaseStrategy': 'execute', 'AsyncBaseStrategy': 'execute_async'}
+
 
 class StrategyValidator:
     """
@@ -188,20 +191,20 @@ class StrategyValidator:
             if isinstance(node, ast.ImportFrom):
                 if (node.module and 
                     'base_strategy' in node.module and 
-                    any(alias.name == 'BaseStrategy' for alias in node.names)):
+                    any(alias.name in BASE_CLASSES for alias in node.names)):
                     has_base_import = True
             
             # Check for strategy class
             if isinstance(node, ast.ClassDef):
-                # Check if class inherits from BaseStrategy
+                # Check if class inherits from BaseStrategy or AsyncBaseStrategy
                 for base in node.bases:
-                    if isinstance(base, ast.Name) and base.id == 'BaseStrategy':
+                    if isinstance(base, ast.Name) and base.id in BASE_CLASSES:
                         has_strategy_class = True
                         
-                        # Check for execute method
+                        # Check for execute method (execute_async for AsyncBaseStrategy)
                         for item in node.body:
-                            if (isinstance(item, ast.FunctionDef) and 
-                                item.name == 'execute'):
+                            if (isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and 
+                                item.name == BASE_CLASSES[base.id]):
                                 has_execute_method = True
         
         if not has_base_import:
@@ -45,6 +45,8 @@ auth_cache = TTLCache(maxsize=1024, ttl=300)
 feed_token_cache = TTLCache(maxsize=1024, ttl=300)
 # Define a cache for broker names with a 5-minute TTL (longer since broker rarely changes)
 broker_cache = TTLCache(maxsize=1024, ttl=3000)
+# Define a cache for decrypted API keys with a 5-minute TTL (cleared on key update)
+api_key_cache = TTLCache(maxsize=8192, ttl=300)
 
 engine = create_engine(
     DATABASE_URL,
@@ -192,8 +194,13 @@ def upsert_api_key(user_id, api_key):
         )
         db_session.add(api_key_obj)
     db_session.commit()
+    invalidate_api_key(user_id)
     return api_key_obj.id
 
+def invalidate_api_key(user_id):
+    """Drop the cached decrypted API key for a user"""
+    api_key_cache.pop(user_id, None)
+
 def get_api_key(user_id):
     """Check if user has an API key"""
     try:
@@ -205,10 +212,15 @@ def get_api_key(user_id):
 
 def get_api_key_for_tradingview(user_id):
     """Get decrypted API key for TradingView configuration"""
+    api_key = api_key_cache.get(user_id)
+    if api_key is not None:
+        return api_key
     try:
         api_key_obj = ApiKeys.query.filter_by(user_id=user_id).first()
         if api_key_obj and api_key_obj.api_key_encrypted:
-            return decrypt_token(api_key_obj.api_key_encrypted)
+            api_key = decrypt_token(api_key_obj.api_key_encrypted)
+            api_key_cache[user_id] = api_key
+            return api_key
         return None
     except Exception as e:
         logger.error(f"Error while querying the database for API key: {e}")
@@ -3,6 +3,7 @@
 from sqlalchemy import create_engine, Column, Integer, String, Boolean, MetaData
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from cachetools import TTLCache
 import os
 from utils.logging import get_logger
 
@@ -21,6 +22,10 @@ db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind
 Base = declarative_base()
 Base.query = db_session.query_property()
 
+# Analyze mode is read on every order request. Keep it in memory briefly; it is updated
+# in place when switched, and the short TTL bounds staleness across worker processes.
+analyze_mode_cache = TTLCache(maxsize=1, ttl=5)
+
 class Settings(Base):
     __tablename__ = 'settings'
     id = Column(Integer, primary_key=True)
@@ -42,11 +47,15 @@ def init_db():
 
 def get_analyze_mode():
     """Get current analyze mode setting"""
+    analyze_mode = analyze_mode_cache.get('analyze_mode')
+    if analyze_mode is not None:
+        return analyze_mode
     settings = Settings.query.first()
     if not settings:
         settings = Settings(analyze_mode=False)  # Default to Live Mode
         db_session.add(settings)
         db_session.commit()
+    analyze_mode_cache['analyze_mode'] = settings.analyze_mode
     return settings.analyze_mode
 
 def set_analyze_mode(mode: bool):
@@ -58,3 +67,4 @@ def set_analyze_mode(mode: bool):
     else:
         settings.analyze_mode = mode
     db_session.commit()
+    analyze_mode_cache['analyze_mode'] = mode
@@ -1,10 +1,13 @@
 from sqlalchemy import create_engine, Column, Integer, String, Boolean, ForeignKey, DateTime, Time, Text
-from sqlalchemy.orm import scoped_session, sessionmaker, relationship
+from sqlalchemy.orm import scoped_session, sessionmaker, relationship, selectinload, validates, reconstructor
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
+from cachetools import TTLCache
 import os
 import logging
 import json
+import threading
+from collections import namedtuple
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,40 @@ db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind
 Base = declarative_base()
 Base.query = db_session.query_property()
 
+# Short-lived read caches for strategies and their symbol mappings, keyed by strategy ID.
+# They hold immutable StrategyRow/SymbolMappingRow snapshots rather than ORM rows so
+# they can be shared across threads; every write path invalidates the affected strategy.
+strategy_cache = TTLCache(maxsize=4096, ttl=5)
+symbol_mappings_cache = TTLCache(maxsize=4096, ttl=5)
+# Webhook IDs never change, so only the webhook ID -> strategy ID link is kept long;
+# the strategy row itself comes from strategy_cache and follows its invalidation.
+webhook_strategy_ids = TTLCache(maxsize=16384, ttl=3600)
+# Prebuilt {symbol: MappingRow} lookup per strategy for webhook order routing
+symbol_map_cache = TTLCache(maxsize=4096, ttl=60)
+cache_lock = threading.RLock()
+
+# Lightweight mapping fields needed to build an order, cached instead of ORM rows
+MappingRow = namedtuple('MappingRow', 'symbol exchange product_type quantity quantity_str')
+
+def invalidate_strategy_cache(strategy_id):
+    """Drop cached strategy and symbol mapping rows for a strategy"""
+    with cache_lock:
+        strategy_cache.pop(strategy_id, None)
+        symbol_mappings_cache.pop(strategy_id, None)
+        symbol_map_cache.pop(strategy_id, None)
+
+def time_to_minutes(value):
+    """Convert an 'HH:MM' (or 'H:MM') time string to minutes since midnight, or None if unset or invalid"""
+    if not value:
+        return None
+    hours, _, minutes = value.partition(':')
+    if not (0 < len(hours) <= 2 and 0 < len(minutes) <= 2 and (hours + minutes).isdecimal()):
+        return None
+    hours, minutes = int(hours), int(minutes)
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
 class Strategy(Base):
     """Model for trading strategies"""
     __tablename__ = 'strategies'
@@ -51,6 +88,24 @@ class Strategy(Base):
     # Relationships
     symbol_mappings = relationship("StrategySymbolMapping", back_populates="strategy", cascade="all, delete-orphan")
     
+    # Trading window boundaries as minutes since midnight (not stored; derived from the strings)
+    start_minutes = None
+    end_minutes = None
+    squareoff_minutes = None
+    
+    @reconstructor
+    def init_time_minutes(self):
+        """Derive trading window minutes when a strategy is loaded from the database."""
+        self.start_minutes = time_to_minutes(self.start_time)
+        self.end_minutes = time_to_minutes(self.end_time)
+        self.squareoff_minutes = time_to_minutes(self.squareoff_time)
+    
+    @validates('start_time', 'end_time', 'squareoff_time')
+    def validate_time(self, key, value):
+        """Keep the derived trading window minutes in sync when a time is set."""
+        setattr(self, key.replace('_time', '_minutes'), time_to_minutes(value))
+        return value
+    
     @property
     def schedule_config_json(self):
         """Get schedule_config as parsed JSON."""
@@ -103,6 +158,31 @@ class StrategySymbolMapping(Base):
     # Relationships
     strategy = relationship("Strategy", back_populates="symbol_mappings")
 
+STRATEGY_COLUMNS = tuple(column.name for column in Strategy.__table__.columns)
+SYMBOL_MAPPING_COLUMNS = tuple(column.name for column in StrategySymbolMapping.__table__.columns)
+
+class StrategyRow(namedtuple('StrategyRow', STRATEGY_COLUMNS + ('start_minutes', 'end_minutes', 'squareoff_minutes'))):
+    """Read-only snapshot of a strategy's columns and derived trading window minutes"""
+    __slots__ = ()
+
+    # Same JSON parsing as the model's read-only properties
+    schedule_config_json = property(Strategy.schedule_config_json.fget)
+    strategy_config_json = property(Strategy.strategy_config_json.fget)
+
+    @classmethod
+    def from_model(cls, strategy):
+        """Snapshot a Strategy model"""
+        return cls(
+            *(getattr(strategy, name) for name in STRATEGY_COLUMNS),
+            strategy.start_minutes, strategy.end_minutes, strategy.squareoff_minutes
+        )
+
+SymbolMappingRow = namedtuple('SymbolMappingRow', SYMBOL_MAPPING_COLUMNS)
+
+def symbol_mapping_rows(mappings):
+    """Snapshot symbol mapping models into SymbolMappingRow tuples"""
+    return [SymbolMappingRow(*(getattr(mapping, name) for name in SYMBOL_MAPPING_COLUMNS)) for mapping in mappings]
+
 def init_db():
     """Initialize the database"""
     logger.info("Initializing Strategy DB")
@@ -158,20 +238,93 @@ def create_custom_strategy(name, webhook_id, user_id, strategy_file, strategy_ca
 
 def get_strategy(strategy_id):
     """Get strategy by ID"""
+    with cache_lock:
+        if strategy_id in strategy_cache:
+            return strategy_cache[strategy_id]
     try:
-        return Strategy.query.get(strategy_id)
+        strategy = Strategy.query.get(strategy_id)
+        if strategy:
+            strategy = StrategyRow.from_model(strategy)
+            with cache_lock:
+                strategy_cache[strategy_id] = strategy
+        return strategy
     except Exception as e:
         logger.error(f"Error getting strategy {strategy_id}: {str(e)}")
         return None
 
+def get_strategy_with_mappings(strategy_id, user_id):
+    """Get a user's strategy and its symbol mappings, or (None, []) if not found or not owned"""
+    with cache_lock:
+        strategy = strategy_cache.get(strategy_id)
+        mappings = symbol_mappings_cache.get(strategy_id)
+    if strategy is not None and mappings is not None:
+        return (strategy, mappings) if strategy.user_id == user_id else (None, [])
+    try:
+        strategy = Strategy.query.options(selectinload(Strategy.symbol_mappings)).filter_by(
+            id=strategy_id, user_id=user_id
+        ).one_or_none()
+        if not strategy:
+            return None, []
+        mappings = symbol_mapping_rows(strategy.symbol_mappings)
+        strategy = StrategyRow.from_model(strategy)
+        with cache_lock:
+            strategy_cache[strategy_id] = strategy
+            symbol_mappings_cache[strategy_id] = mappings
+        return strategy, mappings
+    except Exception as e:
+        logger.error(f"Error getting strategy {strategy_id} with mappings: {str(e)}")
+        return None, []
+
 def get_strategy_by_webhook_id(webhook_id):
     """Get strategy by webhook ID"""
+    with cache_lock:
+        strategy_id = webhook_strategy_ids.get(webhook_id)
+    if strategy_id is not None:
+        strategy = get_strategy(strategy_id)
+        if not strategy:
+            with cache_lock:
+                webhook_strategy_ids.pop(webhook_id, None)
+        return strategy
     try:
-        return Strategy.query.filter_by(webhook_id=webhook_id).first()
+        strategy = Strategy.query.filter_by(webhook_id=webhook_id).first()
+        if strategy:
+            strategy = StrategyRow.from_model(strategy)
+            with cache_lock:
+                strategy_cache[strategy.id] = strategy
+                webhook_strategy_ids[webhook_id] = strategy.id
+        return strategy
     except Exception as e:
         logger.error(f"Error getting strategy by webhook ID {webhook_id}: {str(e)}")
         return None
 
+def get_strategy_with_mappings_by_webhook_id(webhook_id):
+    """Get strategy and its symbol mappings by webhook ID, or (None, []) if not found"""
+    with cache_lock:
+        strategy_id = webhook_strategy_ids.get(webhook_id)
+    if strategy_id is not None:
+        strategy = get_strategy(strategy_id)
+        if not strategy:
+            with cache_lock:
+                webhook_strategy_ids.pop(webhook_id, None)
+            return None, []
+        return strategy, get_symbol_mappings(strategy_id)
+    try:
+        strategy = Strategy.query.options(selectinload(Strategy.symbol_mappings)).filter_by(
+            webhook_id=webhook_id
+        ).first()
+        if not strategy:
+            return None, []
+        mappings = symbol_mapping_rows(strategy.symbol_mappings)
+        strategy = StrategyRow.from_model(strategy)
+        with cache_lock:
+            strategy_cache[strategy.id] = strategy
+            symbol_mappings_cache[strategy.id] = mappings
+            webhook_strategy_ids[webhook_id] = strategy.id
+        return strategy, mappings
+    except Exception as e:
+        logger.error(f"Error getting strategy with mappings by webhook ID {webhook_id}: {str(e)}")
+        return None, []
+
 def get_all_strategies():
     """Get all strategies"""
     try:
@@ -216,12 +369,13 @@ def get_strategies_by_execution_mode(execution_mode, user_id=None):
 def delete_strategy(strategy_id):
     """Delete strategy and its symbol mappings"""
     try:
-        strategy = get_strategy(strategy_id)
+        strategy = Strategy.query.get(strategy_id)
         if not strategy:
             return False
         
         db_session.delete(strategy)
         db_session.commit()
+        invalidate_strategy_cache(strategy_id)
         return True
     except Exception as e:
         logger.error(f"Error deleting strategy {strategy_id}: {str(e)}")
@@ -231,12 +385,13 @@ def delete_strategy(strategy_id):
 def toggle_strategy(strategy_id):
     """Toggle strategy active status"""
     try:
-        strategy = get_strategy(strategy_id)
+        strategy = Strategy.query.get(strategy_id)
         if not strategy:
             return None
         
         strategy.is_active = not strategy.is_active
         db_session.commit()
+        invalidate_strategy_cache(strategy_id)
         return strategy
     except Exception as e:
         logger.error(f"Error toggling strategy {strategy_id}: {str(e)}")
@@ -255,6 +410,7 @@ def update_strategy_times(strategy_id, start_time=None, end_time=None, squareoff
             if squareoff_time is not None:
                 strategy.squareoff_time = squareoff_time
             db_session.commit()
+            invalidate_strategy_cache(strategy_id)
             return True
         return False
     except Exception as e:
@@ -275,6 +431,7 @@ def update_strategy_config(strategy_id, strategy_config=None, schedule_config=No
                 strategy.execution_mode = execution_mode
             strategy.updated_at = func.now()
             db_session.commit()
+            invalidate_strategy_cache(strategy_id)
             return True
         return False
     except Exception as e:
@@ -294,6 +451,7 @@ def add_symbol_mapping(strategy_id, symbol, exchange, quantity, product_type):
         )
         db_session.add(mapping)
         db_session.commit()
+        invalidate_strategy_cache(strategy_id)
         return mapping
     except Exception as e:
         logger.error(f"Error adding symbol mapping: {str(e)}")
@@ -310,6 +468,7 @@ def bulk_add_symbol_mappings(strategy_id, mappings):
             )
             db_session.add(mapping)
         db_session.commit()
+        invalidate_strategy_cache(strategy_id)
         return True
     except Exception as e:
         logger.error(f"Error bulk adding symbol mappings: {str(e)}")
@@ -318,19 +477,45 @@ def bulk_add_symbol_mappings(strategy_id, mappings):
 
 def get_symbol_mappings(strategy_id):
     """Get all symbol mappings for a strategy"""
+    with cache_lock:
+        if strategy_id in symbol_mappings_cache:
+            return symbol_mappings_cache[strategy_id]
     try:
-        return StrategySymbolMapping.query.filter_by(strategy_id=strategy_id).all()
+        mappings = symbol_mapping_rows(StrategySymbolMapping.query.filter_by(strategy_id=strategy_id).all())
+        with cache_lock:
+            symbol_mappings_cache[strategy_id] = mappings
+        return mappings
     except Exception as e:
         logger.error(f"Error getting symbol mappings: {str(e)}")
         return []
 
+def get_symbol_map(strategy_id, mappings=None):
+    """Get the {symbol: MappingRow} dict for a strategy, building it from mappings if already loaded"""
+    with cache_lock:
+        symbol_map = symbol_map_cache.get(strategy_id)
+    if symbol_map is None:
+        if mappings is None:
+            mappings = get_symbol_mappings(strategy_id)
+        symbol_map = {
+            mapping.symbol: MappingRow(
+                mapping.symbol, mapping.exchange, mapping.product_type,
+                mapping.quantity, str(mapping.quantity)
+            )
+            for mapping in mappings
+        }
+        with cache_lock:
+            symbol_map_cache[strategy_id] = symbol_map
+    return symbol_map
+
 def delete_symbol_mapping(mapping_id):
     """Delete a symbol mapping"""
     try:
         mapping = StrategySymbolMapping.query.get(mapping_id)
         if mapping:
+            strategy_id = mapping.strategy_id
             db_session.delete(mapping)
             db_session.commit()
+            invalidate_strategy_cache(strategy_id)
             return True
         return False
     except Exception as e:
@@ -4,7 +4,7 @@ from marshmallow import ValidationError
 from limiter import limiter
 import os
 
-from restx_api.schemas import SmartOrderSchema
+from restx_api.schemas import SmartOrderSchema, BulkSmartOrderSchema
 from services.place_smart_order_service import place_smart_order, emit_analyzer_error
 from database.apilog_db import async_log_order, executor
 from database.settings_db import get_analyze_mode
@@ -19,6 +19,7 @@ logger = get_logger(__name__)
 
 # Initialize schema
 smart_order_schema = SmartOrderSchema()
+bulk_smart_order_schema = BulkSmartOrderSchema()
 
 @api.route('/', strict_slashes=False)
 class SmartOrder(Resource):
@@ -59,3 +60,65 @@ class SmartOrder(Resource):
             error_response = {'status': 'error', 'message': error_message}
             executor.submit(async_log_order, 'placesmartorder', data, error_response)
             return make_response(jsonify(error_response), 500)
+
+@api.route('/bulk', strict_slashes=False)
+class BulkSmartOrder(Resource):
+    @limiter.limit(SMART_ORDER_RATE_LIMIT)
+    def post(self):
+        """Place several smart orders for one strategy in a single request"""
+        try:
+            data = request.json
+
+            # Validate and deserialize input
+            try:
+                bulk_data = bulk_smart_order_schema.load(data)
+            except ValidationError as err:
+                error_message = str(err.messages)
+                if get_analyze_mode():
+                    return make_response(jsonify(emit_analyzer_error(data, error_message)), 400)
+                error_response = {'status': 'error', 'message': error_message}
+                executor.submit(async_log_order, 'placesmartorder', data, error_response)
+                return make_response(jsonify(error_response), 400)
+
+            api_key = bulk_data['apikey']
+            results = []
+            failed = 0
+
+            for order in bulk_data['orders']:
+                order_request = {**order, 'apikey': api_key, 'strategy': bulk_data['strategy']}
+                try:
+                    order_data = smart_order_schema.load(order_request)
+                except ValidationError as err:
+                    results.append({
+                        'symbol': order.get('symbol'),
+                        'status': 'error',
+                        'message': str(err.messages)
+                    })
+                    failed += 1
+                    continue
+
+                order_data.pop('apikey', None)
+                success, response_data, status_code = place_smart_order(
+                    order_data=order_data,
+                    api_key=api_key,
+                    smart_order_delay=SMART_ORDER_DELAY
+                )
+                results.append({'symbol': order_data['symbol'], **response_data})
+                if not success:
+                    failed += 1
+
+            # 207 when only some orders went through, 400 when none did
+            if not failed:
+                return make_response(jsonify({'status': 'success', 'results': results}), 200)
+            if failed < len(results):
+                return make_response(jsonify({'status': 'partial', 'results': results}), 207)
+            return make_response(jsonify({'status': 'error', 'results': results}), 400)
+
+        except Exception as e:
+            logger.exception("An unexpected error occurred in BulkSmartOrder endpoint.")
+            error_message = 'An unexpected error occurred'
+            if get_analyze_mode():
+                return make_response(jsonify(emit_analyzer_error(data, error_message)), 500)
+            error_response = {'status': 'error', 'message': error_message}
+            executor.submit(async_log_order, 'placesmartorder', data, error_response)
+            return make_response(jsonify(error_response), 500)
@@ -1,4 +1,7 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
+
+# Most smart orders accepted in one bulk request, which counts once against the rate limit
+MAX_BULK_SMART_ORDERS = 20
 
 class OrderSchema(Schema):
     apikey = fields.Str(required=True)
@@ -59,6 +62,11 @@ class BasketOrderSchema(Schema):
     strategy = fields.Str(required=True)
     orders = fields.List(fields.Dict(), required=True)  # List of order details
 
+class BulkSmartOrderSchema(Schema):
+    apikey = fields.Str(required=True)
+    strategy = fields.Str(required=True)
+    orders = fields.List(fields.Dict(), required=True, validate=validate.Length(min=1, max=MAX_BULK_SMART_ORDERS))  # List of smart order details
+
 class SplitOrderSchema(Schema):
     apikey = fields.Str(required=True)
     strategy = fields.Str(required=True)
@@ -4,6 +4,7 @@ from threading import Thread
 from utils.session import get_session_expiry_time, set_session_login_time
 from database.auth_db import upsert_auth, get_feed_token as db_get_feed_token
 from database.master_contract_status_db import init_broker_status, update_status
+from utils.dashboard_prefetch import schedule_margin_prefetch
 import importlib
 from utils.logging import get_logger
 
@@ -103,6 +104,8 @@ def handle_auth_success(auth_token, user_session_key, broker, feed_token=None, u
         init_broker_status(broker)
         thread = Thread(target=async_master_contract_download, args=(broker,))
         thread.start()
+        # Warm the dashboard's margin data while the redirect is followed
+        schedule_margin_prefetch(user_session_key, auth_token, broker)
         return redirect(url_for('dashboard_bp.dashboard'))
     else:
         logger.error(f"Failed to upsert auth token for user {user_session_key}")
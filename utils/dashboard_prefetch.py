@@ -0,0 +1,65 @@
+"""
+Dashboard margin data prefetch.
+
+Right after a broker login the margin data for the dashboard is fetched in
+the background while the browser follows the redirect. The dashboard then
+waits on that in-flight fetch instead of calling the broker a second time.
+Prefetches nobody picks up expire after 30 seconds.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib import import_module
+from cachetools import TTLCache
+from database.auth_db import db_session
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+prefetch_pool = ThreadPoolExecutor(max_workers=8)
+
+# In-flight or finished margin data fetches, keyed by user
+prefetch_futures = TTLCache(maxsize=1024, ttl=30)
+prefetch_lock = threading.Lock()
+
+
+@lru_cache(maxsize=32)
+def dynamic_import(broker):
+    """Resolve the broker's get_margin_data function, or None if it cannot be imported"""
+    try:
+        module = import_module(f'broker.{broker}.api.funds')
+        return getattr(module, 'get_margin_data')
+    except ImportError as e:
+        logger.error("Error importing module: %s", e)
+        return None
+
+
+def fetch_margin_data(auth_token, broker):
+    """Fetch margin data on a pool thread, returning None on failure"""
+    try:
+        get_margin_data = dynamic_import(broker)
+        if get_margin_data is None:
+            return None
+        return get_margin_data(auth_token)
+    except Exception as e:
+        logger.debug("Dashboard prefetch failed for broker %s: %s", broker, e)
+        return None
+    finally:
+        db_session.remove()
+
+
+def schedule_margin_prefetch(user, auth_token, broker):
+    """Start fetching the user's margin data ahead of their dashboard visit"""
+    if not (user and auth_token and broker):
+        return
+    with prefetch_lock:
+        if user not in prefetch_futures:
+            prefetch_futures[user] = prefetch_pool.submit(fetch_margin_data, auth_token, broker)
+
+
+def take_prefetched_margin(user):
+    """Wait for and return the user's prefetched margin data, or None if there is none"""
+    with prefetch_lock:
+        future = prefetch_futures.pop(user, None)
+    return future.result() if future is not None else None
@@ -0,0 +1,32 @@
+"""
+Option Greeks kernel.
+
+The arithmetic is compiled with Numba when it is available so that the
+placeholder calculation can later be swapped for a real Black-Scholes
+kernel without changing callers. Without Numba the same function runs as
+plain Python.
+"""
+
+try:
+    from numba import njit, float64, int64
+    from numba.types import UniTuple
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _greeks(seed):
+    """Return (delta, gamma, theta, vega, rho) derived from an integer seed"""
+    delta = 0.3 + (seed % 100) / 100 * 0.7
+    gamma = 0.05 + (seed % 50) / 1000
+    theta = -0.02 - (seed % 30) / 1000
+    vega = 0.1 + (seed % 40) / 1000
+    rho = 0.01 + (seed % 20) / 10000
+    return delta, gamma, theta, vega, rho
+
+
+if NUMBA_AVAILABLE:
+    # Signature-pinned so compilation happens at import, cached across restarts
+    greeks = njit(UniTuple(float64, 5)(int64), cache=True)(_greeks)
+else:
+    greeks = _greeks
@@ -6,6 +6,12 @@ import httpx
 from typing import Optional, Union, Dict, Any, Callable
 from utils.logging import get_logger
 
+try:
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Set up logging
 logger = get_logger(__name__)
 
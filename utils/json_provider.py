@@ -0,0 +1,27 @@
+import json
+import orjson
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Dates, decimals, UUIDs and dataclasses are handed to Flask's default
+    serializer so responses keep the same format as before. Calls that pass
+    stdlib-specific arguments (e.g. the session serializer's object_hook)
+    fall back to the json module.
+    """
+
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault('default', DefaultJSONProvider.default)
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
@@ -0,0 +1,59 @@
+"""
+Columnar (structure-of-arrays) option chain.
+
+Each per-strike field is held in its own contiguous numpy array so that
+aggregates such as put-call ratio and max pain are computed with vector
+operations. The nested per-strike view used by the API is only built at
+the JSON boundary.
+"""
+
+from dataclasses import dataclass
+import numpy as np
+
+# Per-side fields in the order they appear in the API response
+SIDE_FIELDS = ('oi', 'volume', 'iv', 'ltp', 'bid', 'ask', 'change')
+
+
+@dataclass
+class ChainSoA:
+    """Option chain stored as parallel arrays indexed by strike"""
+    strikes: np.ndarray
+    call_oi: np.ndarray
+    call_volume: np.ndarray
+    call_iv: np.ndarray
+    call_ltp: np.ndarray
+    call_bid: np.ndarray
+    call_ask: np.ndarray
+    call_change: np.ndarray
+    put_oi: np.ndarray
+    put_volume: np.ndarray
+    put_iv: np.ndarray
+    put_ltp: np.ndarray
+    put_bid: np.ndarray
+    put_ask: np.ndarray
+    put_change: np.ndarray
+
+    def pcr(self):
+        """Put-call ratio by open interest"""
+        call_total = self.call_oi.sum()
+        return float(self.put_oi.sum() / call_total) if call_total else 0.0
+
+    def max_pain(self):
+        """Strike at which option writers pay out the least at expiry"""
+        settle = self.strikes[:, None]
+        call_pain = np.maximum(settle - self.strikes, 0) * self.call_oi
+        put_pain = np.maximum(self.strikes - settle, 0) * self.put_oi
+        return int(self.strikes[np.argmin((call_pain + put_pain).sum(axis=1))])
+
+    def to_options(self):
+        """Materialize the per-strike list of call/put dicts used by the API"""
+        calls = zip(*(getattr(self, f'call_{f}').tolist() for f in SIDE_FIELDS))
+        puts = zip(*(getattr(self, f'put_{f}').tolist() for f in SIDE_FIELDS))
+        return [
+            {
+                'strike': strike,
+                'call': dict(zip(SIDE_FIELDS, call)),
+                'put': dict(zip(SIDE_FIELDS, put))
+            }
+            for strike, call, put in zip(self.strikes.tolist(), calls, puts)
+        ]